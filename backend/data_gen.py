@@ -5,9 +5,13 @@ Generate BOTH:
   1) data/context/context.csv  (daily 'weather', 'is_event', 'competition_index')
   2) Per-driver trip-level CSVs (zone-aware), plus optional combined all_trips.csv
 
-This version ALWAYS generates a 42-day window ending on the LAST COMPLETED SUNDAY
+By default it generates a --days window (42) ending on the LAST COMPLETED SUNDAY
 in Australia/Sydney time (i.e., end of the previous week). If today is Sunday,
-it uses the Sunday from a week ago.
+it uses the Sunday from a week ago. --start YYYY-MM-DD pins the window start
+instead.
+
+--profile small|medium|large|xl sets driver count, history length and engine
+for benchmark fixtures; explicit --drivers/--days/--engine still win.
 
 Usage (one command):
   python3 data_gen.py \
@@ -15,9 +19,13 @@ Usage (one command):
     --zones data/zones.csv \
     --combined \
     --weekend_as_event
+
+Add --engine philox for the vectorized NumPy generator (same model, different
+but equally reproducible draws; much faster at fleet scale).
 """
 
-import argparse, csv, os, hashlib, uuid, math
+import argparse, bisect, csv, os, hashlib, uuid, math, shutil, time
+from multiprocessing import Pool
 from datetime import datetime, timedelta
 from typing import Dict, List, Tuple, Optional
 
@@ -27,6 +35,11 @@ try:
 except ImportError:
     from backports import zoneinfo  # type: ignore
 
+try:
+    import numpy as np  # only needed for --engine philox
+except ImportError:
+    np = None  # type: ignore
+
 # ---------------- deterministic helper ----------------
 def h01(*parts: str) -> float:
     """Deterministic pseudo-random in [0,1)."""
@@ -47,17 +60,34 @@ HOLIDAYS_NSW = {
     "2025-12-26": "Boxing Day",
 }
 
+# ---------------- scale profiles ----------------
+SCALE_PROFILES = {
+    "small":  {"drivers": 10,      "days": 42,  "engine": "hash"},
+    "medium": {"drivers": 1_000,   "days": 182, "engine": "philox"},
+    "large":  {"drivers": 10_000,  "days": 365, "engine": "philox"},
+    "xl":     {"drivers": 100_000, "days": 730, "engine": "philox"},
+}
+DEFAULT_DRIVERS = 5
+DEFAULT_DAYS = 42
+DEFAULT_ENGINE = "hash"
+
 # ---------------- CLI ----------------
 def parse_args():
     p = argparse.ArgumentParser(description="Generate context + per-driver, zone-aware trip data (self-contained).")
     # Core controls
-    p.add_argument("--drivers", type=int, default=5)
-    # --days/--start kept for compatibility but we always compute 42 days ending last Sunday
-    p.add_argument("--days", type=int, default=42, help="Ignored: always 42 ending last completed Sunday")
-    p.add_argument("--start", type=str, default="", help="Ignored: auto-computed to end last Sunday")
+    p.add_argument("--drivers", type=int, default=None, help=f"Default {DEFAULT_DRIVERS} (or the --profile value)")
+    p.add_argument("--days", type=int, default=None, help=f"Window length in days. Default {DEFAULT_DAYS} (or the --profile value)")
+    p.add_argument("--start", type=str, default="",
+                   help="Window start YYYY-MM-DD. Default: window ends on the last completed Sunday (AU/Sydney)")
+    p.add_argument("--profile", choices=sorted(SCALE_PROFILES), default=None,
+                   help="Scale preset for driver count, history length and engine")
     p.add_argument("--outdir", type=str, default="data")
     p.add_argument("--seed", type=str, default="steady")
     p.add_argument("--combined", action="store_true", help="Also write data/all_trips.csv")
+    p.add_argument("--engine", choices=["hash", "philox"], default=None,
+                   help="hash: per-draw SHA-256 (original); philox: vectorized counter-based NumPy RNG")
+    p.add_argument("--workers", type=int, default=1,
+                   help="Processes to shard drivers across; files are identical for any worker count")
     # Zones
     p.add_argument("--zones", type=str, required=True,
                    help="CSV: zone_id,zone_name,lat,lng,radius_km,base_demand,weekend_mult,rain_mult,event_mult")
@@ -91,7 +121,33 @@ def parse_args():
     p.add_argument("--surge_rain_high", type=float, default=1.35)
     p.add_argument("--surge_event_low", type=float, default=1.08)
     p.add_argument("--surge_event_high", type=float, default=1.25)
-    return p.parse_args()
+    args = p.parse_args()
+    return apply_profile(args)
+
+def apply_profile(args):
+    """Fill --drivers/--days/--engine from the chosen profile, then from defaults."""
+    profile = SCALE_PROFILES.get(args.profile, {})
+    if args.drivers is None:
+        args.drivers = profile.get("drivers", DEFAULT_DRIVERS)
+    if args.days is None:
+        args.days = profile.get("days", DEFAULT_DAYS)
+    if args.engine is None:
+        args.engine = profile.get("engine", DEFAULT_ENGINE)
+    if args.days < 1:
+        raise SystemExit("--days must be at least 1.")
+    return args
+
+TRIP_COLUMNS = [
+    "driver_id","trip_id","date",
+    "pickup_timestamp","dropoff_timestamp",
+    "is_canceled","is_weekend","is_rain","is_event",
+    "pickup_zone","pickup_zone_name","dropoff_zone","dropoff_zone_name",
+    "surge_multiplier","surge_applied",
+    "distance_km","duration_min",
+    "fare_base","fare_time","fare_distance","fare_total",
+    "tip_amount","cancel_fee","service_fee","driver_earnings",
+    "pickup_lat","pickup_lng","dropoff_lat","dropoff_lng"
+]
 
 # ---------------- utils ----------------
 def ensure_dir(path: str):
@@ -105,6 +161,14 @@ def write_csv(path: str, rows: List[Dict], cols: List[str]):
         w.writeheader()
         w.writerows(rows)
 
+def write_rows(path: str, rows: List[list], cols: List[str]):
+    """Like write_csv, for rows already laid out in `cols` order."""
+    ensure_dir(os.path.dirname(path))
+    with open(path, "w", newline="", encoding="utf-8") as f:
+        w = csv.writer(f)
+        w.writerow(cols)
+        w.writerows(rows)
+
 def daterange_days(start: datetime, n: int):
     for i in range(n):
         yield start + timedelta(days=i)
@@ -181,17 +245,25 @@ def tod_intensity(minute_of_day: int) -> float:
     base    = 0.25
     return base + morning + evening + late
 
+MINUTES_PER_DAY = 24 * 60
+
+# Per-minute intensity and its prefix sums: TOD_CDF[m] = sum of TOD_TABLE[:m]
+TOD_TABLE = [tod_intensity(m) for m in range(MINUTES_PER_DAY)]
+TOD_CDF = [0.0]
+for _w in TOD_TABLE:
+    TOD_CDF.append(TOD_CDF[-1] + _w)
+
+def minute_from_uniform(u: float, start_min: int, end_min: int) -> int:
+    """Inverse-CDF draw of a minute in [start_min, end_min) weighted by tod_intensity."""
+    if end_min <= start_min:
+        return start_min
+    target = TOD_CDF[start_min] + u * (TOD_CDF[end_min] - TOD_CDF[start_min])
+    m = bisect.bisect_right(TOD_CDF, target, start_min, end_min + 1) - 1
+    return min(max(m, start_min), end_min - 1)
+
 def weighted_random_minute(seed_key: str, start_min: int, end_min: int) -> int:
     """Pick a minute in [start_min, end_min) proportional to tod_intensity, deterministically."""
-    span = max(1, end_min - start_min)
-    best_m, best_score = start_min, -1
-    for k in range(6):
-        u = h01(seed_key, f"cand{k}")
-        cand = start_min + int(u * span)
-        score = tod_intensity(cand) * (0.9 + 0.2 * h01(seed_key, f"j{k}"))
-        if score > best_score:
-            best_score, best_m = score, cand
-    return best_m
+    return minute_from_uniform(h01(seed_key, "minute"), start_min, end_min)
 
 # ---------------- zones & geo ----------------
 def load_zones(path: str) -> List[Dict]:
@@ -226,26 +298,68 @@ def sample_point_in_circle(lat: float, lng: float, radius_km: float, key: str) -
     dlng = (r_km / KM_PER_DEG_LNG_AT_SYD) * math.sin(theta)
     return round(lat + dlat, 6), round(lng + dlng, 6)
 
-def pick_zone(zones: List[Dict], is_weekend: bool, weather: str, is_event: int,
-              competition_index: float, seed_key: str) -> Dict:
-    """Weighted lottery over zones using base_demand + modifiers; deterministic."""
-    weights = []
-    for z in zones:
-        w = z["base_demand"]
-        if is_weekend: w *= z["weekend_mult"]
-        if weather == "rain": w *= z["rain_mult"]
-        if is_event: w *= z["event_mult"]
-        w *= max(0.6, 1.0 - 0.3 * competition_index)
-        w *= (0.95 + 0.10 * h01(seed_key, z["zone_id"]))
-        weights.append(max(0.0001, w))
+def build_alias_table(weights: List[float]) -> Tuple[List[float], List[int]]:
+    """Vose alias table: pick column i uniformly, keep it with prob[i], else take alias[i]."""
+    n = len(weights)
     total = sum(weights)
-    u = h01(seed_key, "choice") * total
-    acc = 0.0
-    for i, w in enumerate(weights):
-        acc += w
-        if u <= acc:
-            return zones[i]
-    return zones[-1]
+    scaled = [w * n / total for w in weights]
+    prob, alias = [1.0] * n, list(range(n))
+    small = [i for i, p in enumerate(scaled) if p < 1.0]
+    large = [i for i, p in enumerate(scaled) if p >= 1.0]
+    while small and large:
+        s, l = small.pop(), large.pop()
+        prob[s], alias[s] = scaled[s], l
+        scaled[l] = scaled[l] + scaled[s] - 1.0
+        (small if scaled[l] < 1.0 else large).append(l)
+    return prob, alias
+
+def zone_context_id(is_weekend: int, weather: str, is_event: int) -> int:
+    """Index of the demand context a zone lottery depends on (0..7)."""
+    return 4 * int(bool(is_weekend)) + 2 * int(weather == "rain") + int(bool(is_event))
+
+class ZoneSampler:
+    """
+    O(1) weighted zone lottery using base_demand + modifiers.
+
+    Zone weights only depend on (is_weekend, rain, is_event), so all eight
+    alias tables are built once up front. The competition factor scales every
+    zone equally and cancels out of the lottery, so it needs no table of its own.
+    """
+
+    def __init__(self, zones: List[Dict]):
+        self.zones = zones
+        self.tables: List[Tuple[List[float], List[int]]] = []
+        for ctx_id in range(8):
+            weekend, rain, event = ctx_id & 4, ctx_id & 2, ctx_id & 1
+            weights = []
+            for z in zones:
+                w = z["base_demand"]
+                if weekend: w *= z["weekend_mult"]
+                if rain: w *= z["rain_mult"]
+                if event: w *= z["event_mult"]
+                weights.append(max(0.0001, w))
+            self.tables.append(build_alias_table(weights))
+        if np is not None:
+            self.prob = np.array([t[0] for t in self.tables], dtype=np.float64)
+            self.alias = np.array([t[1] for t in self.tables], dtype=np.int64)
+
+    def pick_index(self, ctx_id: int, u_col: float, u_keep: float) -> int:
+        prob, alias = self.tables[ctx_id]
+        col = min(int(u_col * len(prob)), len(prob) - 1)
+        return col if u_keep < prob[col] else alias[col]
+
+    def pick_indices_np(self, ctx_ids: "np.ndarray", u: "np.ndarray") -> "np.ndarray":
+        """Vectorized pick_index; u has two uniform columns per draw."""
+        n_zones = self.prob.shape[1]
+        col = np.minimum((u[:, 0] * n_zones).astype(np.int64), n_zones - 1)
+        keep = u[:, 1] < self.prob[ctx_ids, col]
+        return np.where(keep, col, self.alias[ctx_ids, col])
+
+def pick_zone(sampler: ZoneSampler, is_weekend: bool, weather: str, is_event: int,
+              seed_key: str) -> Dict:
+    """Weighted lottery over zones; deterministic per seed_key."""
+    ctx_id = zone_context_id(is_weekend, weather, is_event)
+    return sampler.zones[sampler.pick_index(ctx_id, h01(seed_key, "choice"), h01(seed_key, "keep"))]
 
 # ---------------- core per-day trip synthesis ----------------
 def synth_trips_for_day(
@@ -253,7 +367,7 @@ def synth_trips_for_day(
     dt: datetime,
     seed: str,
     ctx: Dict,
-    zones: List[Dict],
+    sampler: ZoneSampler,
     args
 ) -> List[Dict]:
     date_str = dt.date().isoformat()
@@ -315,8 +429,8 @@ def synth_trips_for_day(
         end_min = min(online_end_min, start_min + dur)
 
         # zone selection
-        z_pick = pick_zone(zones, bool(is_weekend), weather, is_event, comp, key)
-        z_drop = z_pick if h01(key, "stay") < 0.7 else pick_zone(zones, bool(is_weekend), weather, is_event, comp, key+"drop")
+        z_pick = pick_zone(sampler, bool(is_weekend), weather, is_event, key)
+        z_drop = z_pick if h01(key, "stay") < 0.7 else pick_zone(sampler, bool(is_weekend), weather, is_event, key+"drop")
 
         # coordinates inside chosen zones
         pickup_lat, pickup_lng = sample_point_in_circle(z_pick["lat"], z_pick["lng"], z_pick["radius_km"], key+"p")
@@ -340,7 +454,7 @@ def synth_trips_for_day(
         fare_total = max(6.0, round((fare_base + fare_time + fare_dist) * zone_surge, 2))
 
         # tips: higher on weekend & with surge; TOD helps
-        tod_weight = 0.8 + 0.4 * tod_intensity(start_min)
+        tod_weight = 0.8 + 0.4 * TOD_TABLE[start_min]
         tip_prob = 0.14 * tod_weight * (1.05 if is_weekend else 1.0) * (1.0 + 0.12 * (zone_surge - 1.0))
         tipped = h01(key, "tip") < min(0.9, tip_prob)
         tip_amount = round((1.0 + 5.0 * h01(key, "tip_amt")) * (1.0 + 0.1 * (zone_surge - 1.0)), 2) if tipped else 0.0
@@ -386,7 +500,7 @@ def synth_trips_for_day(
     # canceled trips (assign a pickup zone, no dropoff)
     for k in range(trips_canceled):
         key = f"{driver_id}|{date_str}|c{k}|{seed}"
-        z_pick = pick_zone(zones, bool(is_weekend), weather, is_event, comp, key)
+        z_pick = pick_zone(sampler, bool(is_weekend), weather, is_event, key)
         tmin = weighted_random_minute(key, online_start_min, online_end_min)
         cancel_fee = round(5.0 + 7.0 * h01(key, "cfee"), 2) if h01(key, "has_cfee") < 0.25 else 0.0
         pickup_lat, pickup_lng = sample_point_in_circle(z_pick["lat"], z_pick["lng"], z_pick["radius_km"], key+"p")
@@ -426,26 +540,353 @@ def synth_trips_for_day(
     rows.sort(key=lambda r: r["pickup_timestamp"])
     return rows
 
+
+# ---------------- vectorized counter-based engine (--engine philox) ----------------
+# Philox is counter-based: the key is derived from (seed, driver) and every date
+# owns a fixed-size block of the counter space, so a day's trips depend only on
+# (seed, driver, date) -- not on the window, order, or process that generated
+# them. A driver's whole window is one contiguous counter range, drawn in a
+# single call and synthesized as arrays.
+
+MINUTE_LABELS = [f"{m // 60:02d}:{m % 60:02d}:00" for m in range(MINUTES_PER_DAY)]
+RAW_PER_COUNTER = 4  # Philox4x64 yields four uint64 per counter step
+
+def philox_key(seed: str, *parts: str) -> int:
+    """128-bit Philox key from the seed and any identifying parts."""
+    return int.from_bytes(hashlib.sha256("|".join((seed,) + parts).encode()).digest()[:16], "little")
+
+def philox_raw(key: int, counter: int, n: int) -> "np.ndarray":
+    """n raw uint64 draws starting at a counter position."""
+    return np.random.Philox(key=key, counter=counter).random_raw(n)
+
+def to_unit(raw: "np.ndarray") -> "np.ndarray":
+    """uint64 draws -> float64 uniforms in [0,1)."""
+    return (raw >> np.uint64(11)) * (1.0 / (1 << 53))
+
+TOD_TABLE_NP = np.array(TOD_TABLE) if np is not None else None
+TOD_CDF_NP = np.array(TOD_CDF) if np is not None else None
+
+def zone_arrays(zones: List[Dict]) -> Dict:
+    """Zone table as column arrays for vectorized lookups."""
+    out = {k: np.array([z[k] for z in zones], dtype=np.float64)
+           for k in ("lat", "lng", "radius_km", "base_demand", "weekend_mult", "rain_mult", "event_mult")}
+    out["zone_id"] = [z["zone_id"] for z in zones]
+    out["zone_name"] = [z["zone_name"] for z in zones]
+    return out
+
+def _slots(widths: List[Tuple[str, int]]) -> Tuple[Dict[str, slice], int]:
+    """Named column slices for a per-trip draw matrix, plus its total width."""
+    out, pos = {}, 0
+    for name, width in widths:
+        out[name] = slice(pos, pos + width)
+        pos += width
+    return out, pos
+
+def day_layout(args) -> Dict:
+    """
+    Fixed per-day block of draws: day scalars, then a slot per possible
+    completed trip, then a slot per possible canceled trip. Unused slots are
+    skipped, which keeps every date's block the same size.
+    """
+    peak_demand = args.weekend_demand_mult * args.rain_demand_mult * args.event_demand_mult * 1.1
+    max_offered = int(math.ceil(12.0 * args.thr_base_max * peak_demand)) + 1
+    max_canceled = int(math.ceil(max_offered * args.cancel_rate_max * 1.05)) + 1
+    completed, k_completed = _slots([
+        ("minute", 1), ("dur", 1),
+        ("pick", 2), ("stay", 1), ("drop", 2),
+        ("p_point", 2), ("d_point", 2), ("km", 1),
+        ("tip", 1), ("tip_amt", 1), ("uuid", 2),
+    ])
+    canceled, k_canceled = _slots([
+        ("pick", 2), ("minute", 1),
+        ("has_cfee", 1), ("cfee", 1), ("p_point", 2), ("uuid", 2),
+    ])
+    n_scalars = 8
+    size = n_scalars + max_offered * k_completed + max_canceled * k_canceled
+    size += -size % RAW_PER_COUNTER
+    return {
+        "n_scalars": n_scalars, "size": size,
+        "max_completed": max_offered, "k_completed": k_completed, "completed": completed,
+        "max_canceled": max_canceled, "k_canceled": k_canceled, "canceled": canceled,
+    }
+
+def driver_params(seed: str, driver_id: str, args) -> Dict[str, float]:
+    """Per-driver constants (hours, throughput, cancel rate, fare and fee coefficients)."""
+    u = to_unit(philox_raw(philox_key(seed, driver_id), 0, 8))
+    return {
+        "base_hours": args.base_daily_hours_min + (args.base_daily_hours_max - args.base_daily_hours_min) * u[0],
+        "thr_base": args.thr_base_min + (args.thr_base_max - args.thr_base_min) * u[1],
+        "cancel_rate": args.cancel_rate_min + (args.cancel_rate_max - args.cancel_rate_min) * u[2],
+        "fare_base": round(3.5 + 2.5 * u[3], 2),
+        "fare_time_coef": 0.8 + 0.8 * u[4],
+        "fare_dist_coef": 3.5 + 4.5 * u[5],
+        "fee_rate": 0.24 + 0.06 * u[6],
+    }
+
+def city_day_draws(seed: str, ordinals: "np.ndarray") -> "np.ndarray":
+    """City-wide (rain_surge, event_surge) uniforms per date, shared by every driver."""
+    key = philox_key(seed, "city")
+    first = int(ordinals[0])
+    raw = philox_raw(key, first, RAW_PER_COUNTER * len(ordinals)).reshape(len(ordinals), RAW_PER_COUNTER)
+    return to_unit(raw[:, :2])
+
+def _weighted_minutes_np(u, start_min, end_min) -> "np.ndarray":
+    """Vectorized minute_from_uniform over a batch of trips."""
+    lo, hi = TOD_CDF_NP[start_min], TOD_CDF_NP[end_min]
+    m = np.searchsorted(TOD_CDF_NP, lo + u * (hi - lo), side="right") - 1
+    return np.where(end_min > start_min, np.clip(m, start_min, end_min - 1), start_min)
+
+def _points_np(za: Dict, idx, u) -> Tuple["np.ndarray", "np.ndarray"]:
+    """Vectorized sample_point_in_circle for zone indices."""
+    r_km = za["radius_km"][idx] * np.sqrt(u[:, 0])
+    theta = 2 * math.pi * u[:, 1]
+    lat = za["lat"][idx] + (r_km / KM_PER_DEG_LAT) * np.cos(theta)
+    lng = za["lng"][idx] + (r_km / KM_PER_DEG_LNG_AT_SYD) * np.sin(theta)
+    return np.round(lat, 6), np.round(lng, 6)
+
+def _uuid4s(raw: "np.ndarray") -> List[str]:
+    """Version-4 UUID strings from pairs of raw uint64 draws."""
+    b = np.ascontiguousarray(raw).view(np.uint8).reshape(-1, 16).copy()
+    b[:, 6] = (b[:, 6] & 0x0F) | 0x40
+    b[:, 8] = (b[:, 8] & 0x3F) | 0x80
+    hexes = b.tobytes().hex()
+    return [f"{h[0:8]}-{h[8:12]}-{h[12:16]}-{h[16:20]}-{h[20:32]}"
+            for h in (hexes[i:i+32] for i in range(0, len(hexes), 32))]
+
+def synth_driver_rows_np(driver_id: str, dates: List[datetime], seed: str,
+                         context: Dict[str, Dict], za: Dict, sampler: ZoneSampler,
+                         layout: Dict, args) -> List[list]:
+    """
+    Same trip model as synth_trips_for_day for all of a driver's dates at once,
+    with rows in TRIP_COLUMNS order and sorted by pickup time.
+    """
+    params = driver_params(seed, driver_id, args)
+    n_days = len(dates)
+    ordinals = np.array([d.toordinal() for d in dates], dtype=np.int64)
+    date_strs = [d.date().isoformat() for d in dates]
+    steps = layout["size"] // RAW_PER_COUNTER
+    raw = philox_raw(philox_key(seed, driver_id), int(ordinals[0]) * steps, n_days * layout["size"])
+    raw = raw.reshape(n_days, layout["size"])
+    if n_days > 1 and (ordinals[-1] - ordinals[0]) != n_days - 1:
+        raise ValueError("philox engine expects a contiguous date window")
+    uni = to_unit(raw)
+
+    # day context
+    ctxs = [context.get(ds, {}) for ds in date_strs]
+    dow = np.array([d.weekday() for d in dates])
+    is_weekend = ((dow >= 5) | (dow == 4)).astype(np.int64)
+    is_rain = np.array([1 if c.get("weather", "clear") == "rain" else 0 for c in ctxs], dtype=np.int64)
+    is_event = np.array([int(c.get("is_event", 0)) for c in ctxs], dtype=np.int64)
+    comp = np.array([float(c.get("competition_index", 0.4)) for c in ctxs])
+    hours_ripple, demand_ripple, start_u, surge_noise = (uni[:, i] for i in range(4))
+
+    def mult(flag, factor):
+        return np.where(flag == 1, factor, 1.0)
+
+    # hours online
+    hours = params["base_hours"] * (0.85 + 0.3 * hours_ripple)
+    hours = hours * mult(is_weekend, args.weekend_hours_mult) * mult(is_rain, args.rain_hours_mult) * mult(is_event, args.event_hours_mult)
+    hours = np.clip(hours, 2.0, 12.0)
+    online_minutes = np.rint(hours * 60).astype(np.int64)
+
+    # throughput / demand -> trips offered
+    demand_mult = mult(is_weekend, args.weekend_demand_mult) * mult(is_rain, args.rain_demand_mult) * mult(is_event, args.event_demand_mult)
+    demand_mult = demand_mult * np.maximum(0.6, 1.0 - args.competition_slope * comp) * (0.9 + 0.2 * demand_ripple)
+    offered = np.maximum(0, np.rint((online_minutes / 60.0) * params["thr_base"] * demand_mult)).astype(np.int64)
+    offered = np.minimum(offered, layout["max_completed"])
+    n_canceled = np.minimum(offered, np.rint(offered * params["cancel_rate"] * (0.95 + 0.1 * is_rain)).astype(np.int64))
+    n_canceled = np.minimum(n_canceled, layout["max_canceled"])
+    n_completed = offered - n_canceled
+
+    online_start = 6*60 + (start_u * (8*60)).astype(np.int64)
+    online_end = np.minimum(23*60+59, online_start + online_minutes)
+
+    # surge multiplier base per day
+    city = city_day_draws(seed, ordinals)
+    surge = mult(is_weekend, args.surge_weekend)
+    surge = surge * np.where(is_rain == 1, args.surge_rain_low + (args.surge_rain_high - args.surge_rain_low) * city[:, 0], 1.0)
+    surge = surge * np.where(is_event == 1, args.surge_event_low + (args.surge_event_high - args.surge_event_low) * city[:, 1], 1.0)
+    surge = np.clip(surge * (0.95 + 0.10 * surge_noise), 1.0, 1.9)
+
+    # zone lottery table per day
+    zone_ctx = 4 * is_weekend + 2 * is_rain + is_event
+
+    # ---- completed trips: live slots of each day's completed block ----
+    n0 = layout["n_scalars"]
+    mc, kc, sc = layout["max_completed"], layout["k_completed"], layout["completed"]
+    live = np.arange(mc)[None, :] < n_completed[:, None]
+    u = uni[:, n0:n0 + mc * kc].reshape(n_days, mc, kc)[live]
+    r = raw[:, n0:n0 + mc * kc].reshape(n_days, mc, kc)[live]
+    day = np.repeat(np.arange(n_days), n_completed)
+
+    start = _weighted_minutes_np(u[:, sc["minute"]][:, 0], online_start[day], online_end[day])
+    dur = (8 + (35 - 8) * u[:, sc["dur"]][:, 0]).astype(np.int64)
+    end = np.minimum(online_end[day], start + dur)
+    z_pick = sampler.pick_indices_np(zone_ctx[day], u[:, sc["pick"]])
+    z_alt = sampler.pick_indices_np(zone_ctx[day], u[:, sc["drop"]])
+    z_drop = np.where(u[:, sc["stay"]][:, 0] < 0.7, z_pick, z_alt)
+    pickup_lat, pickup_lng = _points_np(za, z_pick, u[:, sc["p_point"]])
+    drop_lat, drop_lng = _points_np(za, z_drop, u[:, sc["d_point"]])
+
+    base_km = (dur / 3.0) * (0.8 + 0.4 * u[:, sc["km"]][:, 0])
+    distance_km = np.round(base_km * np.where(z_pick != z_drop, 1.15, 1.0), 2)
+    zone_surge = np.clip(surge[day] * (0.98 + 0.06 * (za["base_demand"][z_pick] - 1.0)), 1.0, 2.0)
+
+    fare_base = params["fare_base"]
+    fare_time = np.round(params["fare_time_coef"] * (dur / 10.0), 2)
+    fare_dist = np.round(params["fare_dist_coef"] * (distance_km / 5.0), 2)
+    fare_total = np.maximum(6.0, np.round((fare_base + fare_time + fare_dist) * zone_surge, 2))
+
+    tod_weight = 0.8 + 0.4 * TOD_TABLE_NP[start]
+    tip_prob = 0.14 * tod_weight * mult(is_weekend[day], 1.05) * (1.0 + 0.12 * (zone_surge - 1.0))
+    tipped = u[:, sc["tip"]][:, 0] < np.minimum(0.9, tip_prob)
+    tip_amount = np.where(tipped, np.round((1.0 + 5.0 * u[:, sc["tip_amt"]][:, 0]) * (1.0 + 0.1 * (zone_surge - 1.0)), 2), 0.0)
+    service_fee = np.round(fare_total * params["fee_rate"], 2)
+    driver_earnings = np.round(fare_total - service_fee + tip_amount, 2)
+
+    zid, zname = za["zone_id"], za["zone_name"]
+    n = len(day)
+    day_l, pick_l, drop_l = day.tolist(), z_pick.tolist(), z_drop.tolist()
+    completed = list(zip(
+        [driver_id] * n, _uuid4s(r[:, sc["uuid"]]), [date_strs[d] for d in day_l],
+        [f"{date_strs[d]}T{MINUTE_LABELS[m]}" for d, m in zip(day_l, start.tolist())],
+        [f"{date_strs[d]}T{MINUTE_LABELS[m]}" for d, m in zip(day_l, end.tolist())],
+        [0] * n, is_weekend[day].tolist(), is_rain[day].tolist(), is_event[day].tolist(),
+        [zid[i] for i in pick_l], [zname[i] for i in pick_l],
+        [zid[i] for i in drop_l], [zname[i] for i in drop_l],
+        np.round(zone_surge, 3).tolist(), (zone_surge > 1.0).astype(int).tolist(),
+        distance_km.tolist(), (end - start).tolist(),
+        [fare_base] * n, fare_time.tolist(), fare_dist.tolist(), fare_total.tolist(),
+        tip_amount.tolist(), [0.0] * n, service_fee.tolist(), driver_earnings.tolist(),
+        pickup_lat.tolist(), pickup_lng.tolist(), drop_lat.tolist(), drop_lng.tolist(),
+    ))
+
+    # ---- canceled trips (assign a pickup zone, no dropoff) ----
+    c0 = n0 + mc * kc
+    mx, kx, sx = layout["max_canceled"], layout["k_canceled"], layout["canceled"]
+    live = np.arange(mx)[None, :] < n_canceled[:, None]
+    u = uni[:, c0:c0 + mx * kx].reshape(n_days, mx, kx)[live]
+    r = raw[:, c0:c0 + mx * kx].reshape(n_days, mx, kx)[live]
+    cday = np.repeat(np.arange(n_days), n_canceled)
+
+    c_pick = sampler.pick_indices_np(zone_ctx[cday], u[:, sx["pick"]])
+    tmin = _weighted_minutes_np(u[:, sx["minute"]][:, 0], online_start[cday], online_end[cday])
+    cancel_fee = np.where(u[:, sx["has_cfee"]][:, 0] < 0.25, np.round(5.0 + 7.0 * u[:, sx["cfee"]][:, 0], 2), 0.0).tolist()
+    c_lat, c_lng = _points_np(za, c_pick, u[:, sx["p_point"]])
+    c = len(cday)
+    cday_l, c_pick_l = cday.tolist(), c_pick.tolist()
+    c_stamps = [f"{date_strs[d]}T{MINUTE_LABELS[m]}" for d, m in zip(cday_l, tmin.tolist())]
+    canceled = list(zip(
+        [driver_id] * c, _uuid4s(r[:, sx["uuid"]]), [date_strs[d] for d in cday_l], c_stamps, c_stamps,
+        [1] * c, is_weekend[cday].tolist(), is_rain[cday].tolist(), is_event[cday].tolist(),
+        [zid[i] for i in c_pick_l], [zname[i] for i in c_pick_l], [None] * c, [None] * c,
+        [1.0] * c, [0] * c, [0.0] * c, [0] * c,
+        [0.0] * c, [0.0] * c, [0.0] * c, [0.0] * c,
+        [0.0] * c, cancel_fee, [0.0] * c, cancel_fee,
+        c_lat.tolist(), c_lng.tolist(), [None] * c, [None] * c,
+    ))
+
+    # day, then pickup minute; completed before canceled on ties (as the hash engine)
+    rows = completed + canceled
+    order = np.argsort(np.concatenate([day * 1440 + start, cday * 1440 + tmin]), kind="stable")
+    return [rows[i] for i in order.tolist()]
+
+# ---------------- sharded generation ----------------
+# Workers synthesize and write one driver file at a time, so memory stays at
+# one driver's rows per process regardless of fleet size. The combined file is
+# assembled by the parent from finished driver files, in driver order.
+
+_WORKER: Dict = {}
+
+def _init_worker(args, zones: List[Dict], context: Dict[str, Dict]):
+    start_dt = datetime.strptime(args.start, "%Y-%m-%d")
+    _WORKER.clear()
+    _WORKER.update(args=args, sampler=ZoneSampler(zones), context=context,
+                   dates=list(daterange_days(start_dt, args.days)))
+    if args.engine == "philox":
+        _WORKER["za"] = zone_arrays(zones)
+        _WORKER["layout"] = day_layout(args)
+
+def generate_driver(driver_id: str) -> Tuple[str, str, int]:
+    """Synthesize and write one driver's trips; returns (driver_id, path, rows)."""
+    args, context = _WORKER["args"], _WORKER["context"]
+    out_path = os.path.join(args.outdir, f"driver_{driver_id}_trips.csv")
+    if args.engine == "philox":
+        rows = synth_driver_rows_np(driver_id, _WORKER["dates"], args.seed, context,
+                                    _WORKER["za"], _WORKER["sampler"], _WORKER["layout"], args)
+        write_rows(out_path, rows, TRIP_COLUMNS)
+    else:
+        rows = []
+        for d in _WORKER["dates"]:
+            ctx = context.get(d.date().isoformat(), {})
+            rows.extend(synth_trips_for_day(driver_id, d, args.seed, ctx, _WORKER["sampler"], args))
+        write_csv(out_path, rows, TRIP_COLUMNS)
+    return driver_id, out_path, len(rows)
+
+def append_csv_body(dst, src_path: str):
+    """Stream a CSV into an open file, skipping its header."""
+    with open(src_path, "r", newline="", encoding="utf-8") as src:
+        src.readline()
+        shutil.copyfileobj(src, dst)
+
+def generate_fleet(args, zones: List[Dict], context: Dict[str, Dict]) -> Tuple[int, int]:
+    """
+    Generate every driver (sharded across --workers) and the optional combined
+    file; returns (trips, bytes written).
+    """
+    driver_ids = [f"D{i:04d}" for i in range(1, args.drivers + 1)]
+    combined = None
+    if args.combined:
+        combined_path = os.path.join(args.outdir, "all_trips.csv")
+        combined = open(combined_path, "w", newline="", encoding="utf-8")
+        csv.writer(combined).writerow(TRIP_COLUMNS)
+
+    total_rows = total_bytes = 0
+    pool = None
+    try:
+        if args.workers > 1:
+            pool = Pool(args.workers, initializer=_init_worker, initargs=(args, zones, context))
+            results = pool.imap(generate_driver, driver_ids, chunksize=max(1, min(64, args.drivers // (args.workers * 8))))
+        else:
+            _init_worker(args, zones, context)
+            results = map(generate_driver, driver_ids)
+        # imap yields in submission order, so the combined file is always in driver order
+        for _driver_id, path, n_rows in results:
+            total_rows += n_rows
+            total_bytes += os.path.getsize(path)
+            if combined is not None:
+                append_csv_body(combined, path)
+    finally:
+        if pool is not None:
+            pool.close()
+            pool.join()
+        if combined is not None:
+            total_bytes += combined.tell()
+            combined.close()
+    return total_rows, total_bytes
+
 # ---------------- main ----------------
 def main():
     args = parse_args()
     ensure_dir(args.outdir)
 
-    # Compute the 42-day window ending LAST COMPLETED SUNDAY in Australia/Sydney
-    syd = zoneinfo.ZoneInfo("Australia/Sydney")
-    today = datetime.now(syd).date()
-    # Monday=0 .. Sunday=6 ; days since most recent Sunday:
-    days_since_sunday = (today.weekday() + 1) % 7
-    # Last completed Sunday = if today is Sunday, go back 7 days; else, go back to that Sunday
-    last_sunday = today - timedelta(days=days_since_sunday or 7)
-    end_date = last_sunday
-    DAYS = 42
-    start_date = end_date - timedelta(days=DAYS - 1)
-
-    # Overwrite any provided start/days with the aligned window
-    args.days = DAYS
-    args.start = start_date.isoformat()
-    print(f"Window: {args.start} → {end_date.isoformat()} (42 days, AU/Sydney, aligned to last Sunday)")
+    if args.start:
+        start_date = datetime.strptime(args.start, "%Y-%m-%d").date()
+        end_date = start_date + timedelta(days=args.days - 1)
+        print(f"Window: {args.start} → {end_date.isoformat()} ({args.days} days)")
+    else:
+        # Window of --days ending LAST COMPLETED SUNDAY in Australia/Sydney
+        syd = zoneinfo.ZoneInfo("Australia/Sydney")
+        today = datetime.now(syd).date()
+        # Monday=0 .. Sunday=6 ; days since most recent Sunday:
+        days_since_sunday = (today.weekday() + 1) % 7
+        # Last completed Sunday = if today is Sunday, go back 7 days; else, go back to that Sunday
+        end_date = today - timedelta(days=days_since_sunday or 7)
+        start_date = end_date - timedelta(days=args.days - 1)
+        args.start = start_date.isoformat()
+        print(f"Window: {args.start} → {end_date.isoformat()} ({args.days} days, AU/Sydney, aligned to last Sunday)")
+    if args.profile:
+        print(f"Profile: {args.profile} ({args.drivers:,} drivers × {args.days} days, {args.engine} engine)")
 
     # 1) Zones (required)
     zones = load_zones(args.zones)
@@ -464,36 +905,16 @@ def main():
             seed=args.seed,
         )
 
-    start_dt = datetime.strptime(args.start, "%Y-%m-%d")
-
-    cols = [
-        "driver_id","trip_id","date",
-        "pickup_timestamp","dropoff_timestamp",
-        "is_canceled","is_weekend","is_rain","is_event",
-        "pickup_zone","pickup_zone_name","dropoff_zone","dropoff_zone_name",
-        "surge_multiplier","surge_applied",
-        "distance_km","duration_min",
-        "fare_base","fare_time","fare_distance","fare_total",
-        "tip_amount","cancel_fee","service_fee","driver_earnings",
-        "pickup_lat","pickup_lng","dropoff_lat","dropoff_lng"
-    ]
-
-    combined: List[Dict] = []
-
-    for i in range(1, args.drivers + 1):
-        driver_id = f"D{i:04d}"
-        driver_rows: List[Dict] = []
-        for d in daterange_days(start_dt, args.days):
-            ctx = context.get(d.date().isoformat(), {})
-            driver_rows.extend(synth_trips_for_day(driver_id, d, args.seed, ctx, zones, args))
-        write_csv(os.path.join(args.outdir, f"driver_{driver_id}_trips.csv"), driver_rows, cols)
-        if args.combined:
-            combined.extend(driver_rows)
+    if args.engine == "philox" and np is None:
+        raise SystemExit("--engine philox requires numpy.")
 
-    if args.combined:
-        write_csv(os.path.join(args.outdir, "all_trips.csv"), combined, cols)
+    started = time.perf_counter()
+    total_rows, total_bytes = generate_fleet(args, zones, context)
+    elapsed = max(time.perf_counter() - started, 1e-9)
 
-    print(f"Generated {args.drivers} drivers × {args.days} days (zone-aware).")
+    print(f"Generated {args.drivers} drivers × {args.days} days (zone-aware), {total_rows:,} trips.")
+    print(f"Throughput: {total_rows / elapsed:,.0f} trips/sec, {total_bytes / elapsed / 1e6:,.1f} MB/sec "
+          f"({elapsed:.1f}s, {total_bytes / 1e6:,.1f} MB, {args.workers} worker(s), {args.engine} engine)")
     if args.combined:
         print(f"Wrote combined file: {os.path.abspath(os.path.join(args.outdir, 'all_trips.csv'))}")
 
@@ -0,0 +1,239 @@
+"""
+Application data store shared by every server route.
+
+Created once at startup:
+
+    store = DataStore(data_dir="data", feature_store_dir="features/store")
+    store.preload()
+    store.get_steadiness_score("D0001")
+
+preload() restores the steadiness engine from its snapshot (or builds it
+from data/driver_<id>_trips.csv, streaming one file at a time), so
+steadiness routes only touch memory. Other per-driver data is loaded
+lazily: a driver's trips (compact schema, see trip_schema) and hourly
+features (from the feature_builder parquet store, or features/<id>_hourly.csv
+when no store has been built) are read the first time they are needed and
+kept. All access is thread-safe. Each load bumps the
+driver's data_version, which keys ResultCache entries.
+
+Steadiness is scored as of the end of the loaded data (the day after the
+last trip), so a fixed historical dataset still has a full analysis window;
+volatility trends stop at the last complete week before that.
+"""
+
+import glob
+import os
+import re
+import threading
+from dataclasses import dataclass
+from typing import Dict, List, Optional
+
+import numpy as np
+import pandas as pd
+
+from feature_store import FEATURE_COLUMNS, list_drivers, read_features
+from result_cache import DataVersions
+from steadiness_engine import (
+    DEFAULT_ZONES_CSV, SECONDS_PER_DAY, SessionArrays, SteadinessEngine, ZoneInterner,
+    snapshot_header, to_epoch_seconds,
+)
+from trip_schema import read_trips
+
+TRIPS_PATTERN = re.compile(r"driver_(.+)_trips\.csv$")
+HOURLY_PATTERN = re.compile(r"(.+)_hourly\.csv$")
+
+
+def trips_to_sessions(trips: pd.DataFrame, zones: ZoneInterner) -> SessionArrays:
+    """
+    One steadiness session per driving day of a compact trip frame
+
+    A session runs from the day's first pickup to its last dropoff, earns
+    the day's driver_earnings (cancel fees included) and visits the day's
+    distinct pickup zones.
+    """
+    if trips.empty:
+        return SessionArrays.empty()
+    days = trips.groupby("date", sort=True)
+    start = days["pickup_timestamp"].min()
+    end = days["dropoff_timestamp"].max().fillna(start)
+    hours = (end - start).dt.total_seconds().to_numpy() / 3600
+    earnings = days["driver_earnings"].sum().to_numpy() / 100.0
+
+    day_index = days.ngroup().to_numpy()
+    zone_codes = zones.intern_many(trips["pickup_zone"].astype(str).tolist())
+    day_zones = np.unique(np.stack([day_index, zone_codes]), axis=1)
+    zone_offsets = np.zeros(len(start) + 1, dtype=np.int32)
+    np.cumsum(np.bincount(day_zones[0], minlength=len(start)), out=zone_offsets[1:])
+    return SessionArrays.from_arrays(
+        to_epoch_seconds(start.to_numpy()), hours, earnings, day_zones[1], zone_offsets,
+    )
+
+
+@dataclass
+class DriverData:
+    """Everything held in memory for one driver"""
+    driver_id: str
+    trips: pd.DataFrame   # compact trip schema (money in int cents)
+    hourly: pd.DataFrame  # hourly features, as written by feature_builder
+
+    def profile(self) -> Dict:
+        completed = self.trips[self.trips["is_canceled"] == 0]
+        return {
+            "driver_id": self.driver_id,
+            "total_trips": int(len(completed)),
+            "total_canceled_trips": int(len(self.trips) - len(completed)),
+            "total_earnings": round(int(self.trips["driver_earnings"].sum()) / 100, 2),
+            "total_hours": round(float(self.hourly["total_minutes_worked"].sum()) / 60, 1)
+            if not self.hourly.empty else 0.0,
+            "member_since": self.trips["date"].min().date().isoformat() if not self.trips.empty else None,
+        }
+
+
+class DataStore:
+    """In-memory driver data and steadiness engine, loaded once per process."""
+
+    def __init__(self, data_dir: str = "data", feature_store_dir: str = "features/store",
+                 features_dir: str = "features", city: str = "Sydney",
+                 snapshot_path: Optional[str] = None):
+        """
+        Args:
+            data_dir: Directory holding driver_<id>_trips.csv files
+            feature_store_dir: Parquet feature store written by feature_builder
+            features_dir: Directory holding <id>_hourly.csv files (feature_builder
+                --format csv), read only when the parquet store is empty
+            city: Passed to the steadiness engine
+            snapshot_path: Steadiness engine snapshot; restored instead of
+                rebuilding from trips when it was built from exactly the
+                current trip files and zones.csv, and (re)written after a
+                rebuild
+        """
+        self.city = city
+        self.snapshot_path = snapshot_path
+        self.trip_files = self._index(os.path.join(data_dir, "driver_*_trips.csv"), TRIPS_PATTERN)
+        self.feature_store_dir = feature_store_dir
+        self.feature_drivers = set(list_drivers(feature_store_dir))
+        self.hourly_files = {} if self.feature_drivers else self._index(
+            os.path.join(features_dir, "*_hourly.csv"), HOURLY_PATTERN)
+        self.as_of: Optional[int] = None
+        self._drivers: Dict[str, DriverData] = {}
+        self._driver_locks: Dict[str, threading.Lock] = {}
+        self._engine: Optional[SteadinessEngine] = None
+        self.versions = DataVersions()
+        # Guards lazy loads only; the engine is read-only once built and
+        # serves concurrent reads itself (see SteadinessEngine)
+        self._lock = threading.Lock()
+
+    @staticmethod
+    def _index(pattern: str, name_pattern: "re.Pattern") -> Dict[str, str]:
+        files = {}
+        for path in sorted(glob.glob(pattern)):
+            match = name_pattern.search(os.path.basename(path))
+            if match:
+                files[match.group(1)] = path
+        return files
+
+    @property
+    def driver_ids(self) -> List[str]:
+        return sorted(set(self.trip_files) | self.feature_drivers | set(self.hourly_files))
+
+    def data_version(self, driver_id: str) -> int:
+        """Bumped whenever the driver's data is (re)loaded; a ResultCache version_source."""
+        return self.versions(driver_id)
+
+    def preload(self) -> "DataStore":
+        """Restore or build the steadiness engine (call before serving)."""
+        self.steadiness()
+        return self
+
+    # -------------------------------------------------------------------------
+    # Drivers
+    # -------------------------------------------------------------------------
+
+    def driver(self, driver_id: str) -> Optional[DriverData]:
+        """A driver's data, read from disk on first access; None for unknown drivers."""
+        data = self._drivers.get(driver_id)
+        if data is not None:
+            return data
+        if not (driver_id in self.trip_files or driver_id in self.feature_drivers
+                or driver_id in self.hourly_files):
+            return None
+        with self._lock:
+            lock = self._driver_locks.setdefault(driver_id, threading.Lock())
+        with lock:
+            data = self._drivers.get(driver_id)
+            if data is None:
+                data = self._drivers[driver_id] = self._load_driver(driver_id)
+                self.versions.bump(driver_id)
+        return data
+
+    def _load_driver(self, driver_id: str) -> DriverData:
+        trip_path = self.trip_files.get(driver_id)
+        trips = read_trips(trip_path) if trip_path else pd.DataFrame(
+            columns=["date", "pickup_timestamp", "dropoff_timestamp", "is_canceled",
+                     "pickup_zone", "driver_earnings"])
+        hourly_path = self.hourly_files.get(driver_id)
+        if hourly_path:
+            hourly = pd.read_csv(hourly_path, usecols=FEATURE_COLUMNS, parse_dates=["date"])
+        else:
+            hourly = read_features(self.feature_store_dir, driver_ids=[driver_id])
+        return DriverData(driver_id, trips, hourly)
+
+    def get_driver_profile(self, driver_id: str) -> Optional[Dict]:
+        data = self.driver(driver_id)
+        return data.profile() if data is not None else None
+
+    # -------------------------------------------------------------------------
+    # Steadiness
+    # -------------------------------------------------------------------------
+
+    def steadiness(self) -> SteadinessEngine:
+        """The engine over every indexed driver (built, or restored, on first use)."""
+        if self._engine is None:
+            with self._lock:
+                if self._engine is None:
+                    engine = self._restore_engine() or self._build_engine()
+                    last = engine.last_session_time()
+                    self.as_of = None if last is None else (last // SECONDS_PER_DAY + 1) * SECONDS_PER_DAY
+                    self._engine = engine
+                    for driver_id in engine.driver_ids():
+                        self.versions.bump(driver_id)
+        return self._engine
+
+    def _sources(self) -> Dict[str, List[int]]:
+        """[mtime_ns, size] of every file the engine is built from"""
+        sources = {}
+        for path in sorted(self.trip_files.values()) + [DEFAULT_ZONES_CSV]:
+            if os.path.exists(path):
+                stat = os.stat(path)
+                sources[os.path.abspath(path)] = [stat.st_mtime_ns, stat.st_size]
+        return sources
+
+    def _restore_engine(self) -> Optional[SteadinessEngine]:
+        """The snapshot's engine, if its source manifest matches the current files."""
+        if not self.snapshot_path or not os.path.exists(self.snapshot_path):
+            return None
+        try:
+            header = snapshot_header(self.snapshot_path)
+        except ValueError:
+            return None
+        if header.get("city") != self.city or header.get("sources") != self._sources():
+            return None
+        return SteadinessEngine.from_snapshot(self.snapshot_path)
+
+    def _build_engine(self) -> SteadinessEngine:
+        """Sessions from every trip file; trip frames are dropped once converted."""
+        engine = SteadinessEngine(self.city)
+        for driver_id, path in self.trip_files.items():
+            engine.load_driver_sessions(driver_id, trips_to_sessions(read_trips(path), engine.zones))
+        if self.snapshot_path:
+            engine.save_snapshot(self.snapshot_path, sources=self._sources())
+        return engine
+
+    def get_steadiness_score(self, driver_id: str, period: str = "weekly") -> Dict:
+        return self.steadiness().get_steadiness_score(driver_id, period, self.as_of)
+
+    def get_consistency_breakdown(self, driver_id: str) -> Dict:
+        return self.steadiness().get_consistency_breakdown(driver_id, self.as_of)
+
+    def get_volatility_trend(self, driver_id: str, weeks: int = 12) -> Dict:
+        return self.steadiness().get_volatility_trend(driver_id, weeks, as_of=self.as_of)
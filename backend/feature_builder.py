@@ -1,21 +1,89 @@
+import argparse
 import os
 import glob
+import resource
+import sys
+import time
+from concurrent.futures import ProcessPoolExecutor
+from dataclasses import dataclass
+from typing import Dict, List, Optional
+
+import numpy as np
 import pandas as pd
 
-def load_context(context_path: str) -> pd.DataFrame:
+from feature_store import load_watermarks, merge_features, read_features, save_watermarks, write_feature_store
+from metrics_cube import build_cube
+
+# Context used for days the context file does not cover
+CONTEXT_DEFAULTS = {"weather": "clear", "is_event": 0, "competition_index": 0.4}
+
+
+def _day_ordinals(dates) -> np.ndarray:
+    """Days since 1970-01-01 for any date-like column."""
+    return pd.to_datetime(pd.Series(dates)).to_numpy().astype("datetime64[D]").astype(np.int64)
+
+
+@dataclass
+class ContextStore:
+    """
+    Daily context held as dense arrays indexed by day ordinal.
+
+    Missing days are filled with CONTEXT_DEFAULTS once at load time, and one
+    extra trailing slot holds the defaults for dates outside the covered
+    range, so enriching rows is a single array gather.
+    """
+    first_ordinal: int
+    weather_labels: List[str]
+    weather_codes: np.ndarray
+    is_event: np.ndarray
+    competition_index: np.ndarray
+
+    def positions(self, dates) -> np.ndarray:
+        """Array positions for dates; out-of-range dates map to the defaults slot."""
+        offsets = _day_ordinals(dates) - self.first_ordinal
+        default_slot = len(self.weather_codes) - 1
+        return np.where((offsets >= 0) & (offsets < default_slot), offsets, default_slot)
+
+    def gather(self, dates) -> pd.DataFrame:
+        """Context columns aligned row-for-row with `dates`."""
+        pos = self.positions(dates)
+        return pd.DataFrame({
+            "weather": pd.Categorical.from_codes(self.weather_codes[pos], self.weather_labels),
+            "is_event": self.is_event[pos],
+            "competition_index": self.competition_index[pos],
+        })
+
+
+def load_context(context_path: str) -> ContextStore:
     """Load daily weather, event, and competition data."""
     context_data = pd.read_csv(context_path)
-    context_data["date"] = pd.to_datetime(context_data["date"]).dt.date
-    context_data["is_event"] = context_data["is_event"].astype(int)
     context_data["weather"] = context_data["weather"].astype(str).str.lower().str.strip()
-    return context_data[["date", "weather", "is_event", "competition_index"]]
+    ordinals = _day_ordinals(context_data["date"])
+
+    first = int(ordinals.min())
+    size = int(ordinals.max()) - first + 2  # covered days + defaults slot
+    offsets = ordinals - first
+
+    weather_labels = sorted(set(context_data["weather"]) | {CONTEXT_DEFAULTS["weather"]})
+    weather_codes = np.full(size, weather_labels.index(CONTEXT_DEFAULTS["weather"]), dtype=np.int8)
+    weather_codes[offsets] = pd.Categorical(context_data["weather"], categories=weather_labels).codes
+    is_event = np.full(size, CONTEXT_DEFAULTS["is_event"], dtype=np.int64)
+    is_event[offsets] = context_data["is_event"].astype(int)
+    competition_index = np.full(size, CONTEXT_DEFAULTS["competition_index"], dtype=np.float64)
+    competition_index[offsets] = context_data["competition_index"].fillna(CONTEXT_DEFAULTS["competition_index"])
 
+    return ContextStore(first, weather_labels, weather_codes, is_event, competition_index)
 
-def load_trip_data(trip_pattern: str) -> pd.DataFrame:
-    """Load all per-driver trip CSVs matching pattern."""
+
+def load_trip_data(trip_pattern: str, modified_after: Optional[float] = None) -> pd.DataFrame:
+    """Load all per-driver trip CSVs matching pattern (optionally only files touched since a time)."""
     trip_files = sorted(glob.glob(trip_pattern))
     if not trip_files:
         raise SystemExit("No trip data found.")
+    if modified_after is not None:
+        trip_files = [f for f in trip_files if os.path.getmtime(f) > modified_after]
+        if not trip_files:
+            return pd.DataFrame(columns=["driver_id", "pickup_timestamp"])
     all_trips = []
     for file in trip_files:
         df = pd.read_csv(file, parse_dates=["pickup_timestamp", "dropoff_timestamp"])
@@ -67,6 +135,161 @@ def build_hourly_features(trip_data: pd.DataFrame) -> pd.DataFrame:
     return features.sort_values(group_cols).reset_index(drop=True)
 
 
+def build_hourly_features_parallel(trip_data: pd.DataFrame, workers: int) -> pd.DataFrame:
+    """
+    build_hourly_features sharded by driver across a process pool.
+
+    Drivers are split into contiguous sorted ranges and results are
+    concatenated in shard order; driver_id leads the sort key and every
+    group lives in exactly one shard, so the output is identical to the
+    serial path.
+    """
+    if workers <= 1:
+        return build_hourly_features(trip_data)
+    trip_data = trip_data[STREAM_COLUMNS + ["trip_id"]]
+    drivers = sorted(trip_data["driver_id"].unique())
+    n_shards = min(len(drivers), workers * 4)
+    shard_of = {d: i * n_shards // len(drivers) for i, d in enumerate(drivers)}
+    shards = [shard for _, shard in trip_data.groupby(trip_data["driver_id"].map(shard_of), sort=True)]
+    with ProcessPoolExecutor(max_workers=workers) as pool:
+        parts = list(pool.map(build_hourly_features, shards))
+    return pd.concat(parts, ignore_index=True)
+
+
+# Columns needed to aggregate a streamed trip file
+STREAM_COLUMNS = [
+    "driver_id", "pickup_timestamp", "is_canceled", "driver_earnings",
+    "duration_min", "surge_multiplier", "is_rain",
+]
+
+PARTIAL_KEYS = ["driver_id", "date", "hour"]
+
+# How each partial column combines across chunks
+PARTIAL_AGGS = {
+    "total_trips": "sum",
+    "total_canceled_trips": "sum",
+    "total_earnings": "sum",
+    "total_minutes_worked": "sum",
+    "surge_sum": "sum",
+    "any_rain": "max",
+    "last_pickup": "max",
+}
+
+
+def partial_hourly_aggregates(chunk: pd.DataFrame) -> pd.DataFrame:
+    """
+    Mergeable per-hour sums, counts and maxima for one chunk of trips.
+
+    Means are carried as sums so chunks combine exactly; hours with only
+    canceled trips are kept until finalize, since a later chunk may add
+    completed trips to them.
+    """
+    pickup_times = chunk["pickup_timestamp"]
+    completed = chunk["is_canceled"] == 0
+    partial = pd.DataFrame({
+        "driver_id": chunk["driver_id"],
+        "date": pickup_times.dt.normalize(),
+        "hour": pickup_times.dt.hour,
+        "total_trips": completed.astype("int64"),
+        "total_canceled_trips": (~completed).astype("int64"),
+        "total_earnings": chunk["driver_earnings"].where(completed, 0.0),
+        "total_minutes_worked": chunk["duration_min"].where(completed, 0),
+        "surge_sum": chunk["surge_multiplier"].where(completed, 0.0),
+        "any_rain": chunk["is_rain"].where(completed, 0),
+        "last_pickup": pickup_times,
+    })
+    return partial.groupby(PARTIAL_KEYS, as_index=False).agg(PARTIAL_AGGS)
+
+
+def combine_hourly_partials(partials) -> pd.DataFrame:
+    """Reduce several partial aggregates into one."""
+    if len(partials) == 1:
+        return partials[0]
+    return (
+        pd.concat(partials, ignore_index=True)
+        .groupby(PARTIAL_KEYS, as_index=False)
+        .agg(PARTIAL_AGGS)
+    )
+
+
+def finalize_hourly_aggregates(partial: pd.DataFrame) -> pd.DataFrame:
+    """Turn combined partials into the same rows build_hourly_features returns."""
+    features = partial[partial["total_trips"] > 0].copy()
+    features["average_surge"] = features["surge_sum"] / features["total_trips"]
+    features["day_of_week"] = features["date"].dt.dayofweek
+    features["is_weekend"] = (features["day_of_week"] >= 5).astype(int)
+    features["date"] = features["date"].dt.date
+    features["any_rain"] = features["any_rain"].astype(int)
+
+    group_cols = ["driver_id", "date", "hour", "day_of_week", "is_weekend"]
+    value_cols = [
+        "total_trips", "total_earnings", "total_minutes_worked",
+        "average_surge", "any_rain", "total_canceled_trips",
+    ]
+    return features[group_cols + value_cols].sort_values(group_cols).reset_index(drop=True)
+
+
+def stream_hourly_aggregates(trip_path: str, chunksize: int, reduce_every: int = 8):
+    """
+    Aggregate a large trip CSV chunk by chunk in bounded memory.
+
+    Only the columns the aggregation needs are parsed, and buffered partials
+    are folded together every `reduce_every` chunks, so memory is bounded by
+    chunksize plus the size of the hourly output rather than the input.
+    Returns (combined partials, trips read).
+    """
+    partials = []
+    trips_read = 0
+    reader = pd.read_csv(
+        trip_path,
+        usecols=STREAM_COLUMNS,
+        parse_dates=["pickup_timestamp"],
+        chunksize=chunksize,
+    )
+    for chunk in reader:
+        trips_read += len(chunk)
+        partials.append(partial_hourly_aggregates(chunk))
+        if len(partials) >= reduce_every:
+            partials = [combine_hourly_partials(partials)]
+    if not partials:
+        raise SystemExit(f"No trip data found in {trip_path}.")
+    return combine_hourly_partials(partials), trips_read
+
+
+def peak_rss_mb() -> float:
+    """Peak resident set size of this process, in MB."""
+    # ru_maxrss is in bytes on macOS and KiB on Linux
+    unit = 1024 * 1024 if sys.platform == "darwin" else 1024
+    return resource.getrusage(resource.RUSAGE_SELF).ru_maxrss / unit
+
+
+def select_new_trips(trip_data: pd.DataFrame, watermarks: Dict) -> pd.DataFrame:
+    """
+    Trips not yet folded into the store, per driver watermark.
+
+    Selection starts at the top of the watermark's hour rather than just after
+    it: that hour may have been only partially filled at the last build, so it
+    is re-aggregated in full and replaces the stored row.
+    """
+    if not watermarks:
+        return trip_data
+    resume = trip_data["driver_id"].map({d: ts.floor("h") for d, ts in watermarks.items()})
+    new = resume.isna() | (trip_data["pickup_timestamp"] >= resume)
+    return trip_data[new]
+
+
+def resume_hours(trip_data: pd.DataFrame) -> Dict:
+    """First pickup hour per driver in a batch of trips."""
+    return trip_data.groupby("driver_id")["pickup_timestamp"].min().dt.floor("h").to_dict()
+
+
+def attach_context(features: pd.DataFrame, context: ContextStore) -> pd.DataFrame:
+    """Enrich hourly rows with daily context via one array gather."""
+    enriched = context.gather(features["date"])
+    enriched.index = features.index
+    return pd.concat([features, enriched], axis=1)
+
+
 def save_features(features: pd.DataFrame, output_dir: str) -> None:
     """Write one feature file per driver."""
     os.makedirs(output_dir, exist_ok=True)
@@ -83,27 +306,79 @@ def save_features(features: pd.DataFrame, output_dir: str) -> None:
         )
 
 
+def parse_args():
+    p = argparse.ArgumentParser(description="Build hourly driver features from trip CSVs.")
+    p.add_argument("--data_dir", type=str, default="data")
+    p.add_argument("--format", choices=["parquet", "csv"], default="parquet",
+                   help="parquet: partitioned feature store; csv: one file per driver")
+    p.add_argument("--output", type=str, default=None,
+                   help="Output directory (default: features/store for parquet, features for csv)")
+    p.add_argument("--incremental", action="store_true",
+                   help="Only aggregate trips past each driver's watermark and merge into the store")
+    p.add_argument("--stream", type=str, default=None,
+                   help="Aggregate one large trip CSV (e.g. data/all_trips.csv) in chunks instead of driver_*.csv")
+    p.add_argument("--chunksize", type=int, default=1_000_000, help="Rows per chunk with --stream")
+    p.add_argument("--workers", type=int, default=1,
+                   help="Processes for hourly aggregation (drivers are sharded across them)")
+    p.add_argument("--cube", type=str, default=None,
+                   help="Also write a memory-mapped driver×day×hour metrics cube (e.g. features/hourly_cube.npy)")
+    return p.parse_args()
+
+
 def main():
-    data_dir = "data"
+    args = parse_args()
+    data_dir = args.data_dir
     context_path = os.path.join(data_dir, "context/context.csv")
     trip_pattern = os.path.join(data_dir, "driver_*.csv")
-    output_dir = "features"
+    output_dir = args.output or ("features/store" if args.format == "parquet" else "features")
+
+    if args.incremental and args.format != "parquet":
+        raise SystemExit("--incremental requires --format parquet.")
+    if args.incremental and args.stream:
+        raise SystemExit("--stream cannot be combined with --incremental.")
+
+    started_at = time.time()
+    state = load_watermarks(output_dir) if args.incremental else {"built_at": None, "drivers": {}}
 
     context = load_context(context_path)
-    trips = load_trip_data(trip_pattern)
-    features = build_hourly_features(trips)
+    if args.stream:
+        hourly, trips_read = stream_hourly_aggregates(args.stream, args.chunksize)
+        features = attach_context(finalize_hourly_aggregates(hourly), context)
+        last_pickups = hourly.groupby("driver_id")["last_pickup"].max().to_dict()
+        print(f"Streamed {trips_read:,} trips from {args.stream} in chunks of {args.chunksize:,}")
+    else:
+        trips = load_trip_data(trip_pattern, modified_after=state["built_at"])
+        trips = select_new_trips(trips, state["drivers"])
+        if trips.empty:
+            print(f"\nNo new trips since last build of '{output_dir}/'\n")
+            save_watermarks(output_dir, state["drivers"], started_at)
+            return
+        features = attach_context(build_hourly_features_parallel(trips, args.workers), context)
+        last_pickups = trips.groupby("driver_id")["pickup_timestamp"].max().to_dict()
+
+    if args.incremental:
+        merge_features(features, output_dir, resume_hours(trips))
+    elif args.format == "parquet":
+        write_feature_store(features, output_dir)
+    else:
+        save_features(features, output_dir)
 
-    features = features.merge(context, on="date", how="left")
-    features["weather"] = features["weather"].fillna("clear")
-    features["is_event"] = features["is_event"].fillna(0).astype(int)
-    features["competition_index"] = features["competition_index"].fillna(0.4)
+    if args.format == "parquet":
+        watermarks = dict(state["drivers"])
+        watermarks.update(last_pickups)
+        save_watermarks(output_dir, watermarks, started_at)
 
-    save_features(features, output_dir)
+    if args.cube:
+        # Incremental runs only hold the new rows, so rebuild the cube from the store
+        cube_source = read_features(output_dir) if args.incremental else features
+        cube = build_cube(cube_source, args.cube)
+        print(f"Cube: {args.cube} {cube.data.shape} ({cube.start_date} → {cube.end_date})")
 
     print(f"\nFeatures generated in '{output_dir}/'")
     print(f"Rows: {len(features):,}")
     print(f"Drivers: {features['driver_id'].nunique()}")
-    print(f"Dates: {features['date'].nunique()}\n")
+    print(f"Dates: {features['date'].nunique()}")
+    print(f"Peak RSS: {peak_rss_mb():,.1f} MB\n")
 
 
 if __name__ == "__main__":
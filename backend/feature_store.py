@@ -0,0 +1,191 @@
+"""
+Columnar hourly feature store.
+
+Hourly features are written as Parquet, hive-partitioned by driver and month:
+
+    features/store/driver_id=D0001/month=2025-09/part-0.parquet
+
+Readers only open the partitions that can match the requested drivers and
+dates, and only decode the requested columns.
+"""
+
+import json
+import os
+from datetime import date
+from typing import Dict, Iterable, List, Optional
+
+import pandas as pd
+import pyarrow as pa
+import pyarrow.dataset as ds
+
+FEATURE_COLUMNS = [
+    "driver_id", "date", "hour", "day_of_week", "is_weekend",
+    "total_trips", "total_canceled_trips", "total_minutes_worked",
+    "total_earnings", "average_surge", "any_rain",
+    "weather", "is_event", "competition_index",
+]
+
+WATERMARK_FILE = "_watermarks.json"
+
+PARTITIONING = ds.partitioning(
+    pa.schema([("driver_id", pa.string()), ("month", pa.string())]),
+    flavor="hive",
+)
+
+
+def _to_date(value) -> date:
+    return pd.Timestamp(value).date()
+
+
+def _month_key(value: date) -> str:
+    return f"{value.year:04d}-{value.month:02d}"
+
+
+def write_feature_store(features: pd.DataFrame, store_dir: str) -> None:
+    """Write hourly features, replacing any driver/month partitions they touch."""
+    os.makedirs(store_dir, exist_ok=True)
+    df = features[FEATURE_COLUMNS].sort_values(["driver_id", "date", "hour"])
+    df = df.assign(
+        date=pd.to_datetime(df["date"]).dt.date,
+        month=pd.to_datetime(df["date"]).dt.strftime("%Y-%m"),
+    )
+    table = pa.Table.from_pandas(df, preserve_index=False)
+    ds.write_dataset(
+        table,
+        store_dir,
+        format="parquet",
+        partitioning=PARTITIONING,
+        basename_template="part-{i}.parquet",
+        existing_data_behavior="delete_matching",
+    )
+
+
+def load_watermarks(store_dir: str) -> Dict:
+    """
+    Read build state: {"built_at": epoch seconds, "drivers": {driver_id: Timestamp}}.
+
+    Each driver's watermark is the last pickup_timestamp folded into the store.
+    """
+    path = os.path.join(store_dir, WATERMARK_FILE)
+    if not os.path.exists(path):
+        return {"built_at": None, "drivers": {}}
+    with open(path, "r", encoding="utf-8") as f:
+        state = json.load(f)
+    state["drivers"] = {k: pd.Timestamp(v) for k, v in state.get("drivers", {}).items()}
+    return state
+
+
+def save_watermarks(store_dir: str, drivers: Dict, built_at: float) -> None:
+    """Atomically replace the build state file."""
+    os.makedirs(store_dir, exist_ok=True)
+    path = os.path.join(store_dir, WATERMARK_FILE)
+    state = {
+        "built_at": built_at,
+        "drivers": {k: pd.Timestamp(v).isoformat() for k, v in sorted(drivers.items())},
+    }
+    with open(path + ".tmp", "w", encoding="utf-8") as f:
+        json.dump(state, f, indent=2)
+    os.replace(path + ".tmp", path)
+
+
+def merge_features(features: pd.DataFrame, store_dir: str, resume_from: Dict) -> int:
+    """
+    Merge freshly aggregated rows into the store.
+
+    resume_from maps driver_id to the first hour that was re-aggregated; stored
+    rows at or after it are superseded by `features`, earlier rows in the same
+    month partitions are kept. Returns the number of rows written.
+    """
+    if features.empty:
+        return 0
+    kept = []
+    for driver_id in features["driver_id"].unique():
+        resume = resume_from.get(driver_id)
+        if resume is None:
+            continue
+        month_start = date(resume.year, resume.month, 1)
+        existing = read_features(store_dir, driver_ids=[driver_id], start_date=month_start)
+        if existing.empty:
+            continue
+        row_hour = pd.to_datetime(existing["date"]) + pd.to_timedelta(existing["hour"], unit="h")
+        kept.append(existing[row_hour < resume])
+    merged = pd.concat(kept + [features[FEATURE_COLUMNS]], ignore_index=True)
+    write_feature_store(merged, store_dir)
+    return len(merged)
+
+
+def list_drivers(store_dir: str) -> List[str]:
+    """Driver ids present in the store."""
+    if not os.path.isdir(store_dir):
+        return []
+    return sorted(
+        entry.name.split("=", 1)[1]
+        for entry in os.scandir(store_dir)
+        if entry.is_dir() and entry.name.startswith("driver_id=")
+    )
+
+
+def _partition_files(store_dir: str, driver_ids: Iterable[str],
+                     start_month: Optional[str], end_month: Optional[str]) -> List[str]:
+    """Parquet files under the driver/month partitions that can match."""
+    files = []
+    for driver_id in driver_ids:
+        driver_dir = os.path.join(store_dir, f"driver_id={driver_id}")
+        if not os.path.isdir(driver_dir):
+            continue
+        for month_entry in sorted(os.scandir(driver_dir), key=lambda e: e.name):
+            month = month_entry.name.split("=", 1)[-1]
+            if start_month and month < start_month:
+                continue
+            if end_month and month > end_month:
+                continue
+            files.extend(
+                os.path.join(month_entry.path, name)
+                for name in sorted(os.listdir(month_entry.path))
+                if name.endswith(".parquet")
+            )
+    return files
+
+
+def read_features(
+    store_dir: str,
+    columns: Optional[List[str]] = None,
+    driver_ids: Optional[Iterable[str]] = None,
+    start_date=None,
+    end_date=None,
+) -> pd.DataFrame:
+    """
+    Read hourly features with column projection and predicate pushdown.
+
+    driver_ids and the inclusive [start_date, end_date] range prune whole
+    partitions before any file is opened; the date bounds are also pushed
+    down to Parquet row-group statistics.
+    """
+    columns = list(columns) if columns is not None else list(FEATURE_COLUMNS)
+    driver_ids = list_drivers(store_dir) if driver_ids is None else list(driver_ids)
+    start = _to_date(start_date) if start_date is not None else None
+    end = _to_date(end_date) if end_date is not None else None
+
+    files = _partition_files(
+        store_dir, driver_ids,
+        _month_key(start) if start else None,
+        _month_key(end) if end else None,
+    )
+    if not files:
+        return pd.DataFrame(columns=columns)
+
+    dataset = ds.dataset(
+        files,
+        format="parquet",
+        partitioning=PARTITIONING,
+        partition_base_dir=store_dir,
+    )
+    predicate = None
+    if start is not None:
+        predicate = ds.field("date") >= start
+    if end is not None:
+        upper = ds.field("date") <= end
+        predicate = upper if predicate is None else predicate & upper
+
+    table = dataset.to_table(columns=columns, filter=predicate)
+    return table.to_pandas()
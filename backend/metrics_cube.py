@@ -0,0 +1,123 @@
+"""
+Dense driver × day × hour × metric cube over hourly features.
+
+The cube is a float32 .npy file that readers memory-map, plus a JSON index
+mapping driver_id and dates to axis offsets:
+
+    features/hourly_cube.npy
+    features/hourly_cube.json
+
+Questions like "earnings for driver X, hours 17-19, last 8 Fridays" become a
+slice instead of a parse and groupby. Hours with no activity are zero.
+"""
+
+import json
+import os
+from datetime import date, timedelta
+from typing import Dict, Iterable, List, Optional, Sequence
+
+import numpy as np
+import pandas as pd
+
+CUBE_METRICS = [
+    "total_trips", "total_canceled_trips", "total_minutes_worked",
+    "total_earnings", "average_surge", "any_rain",
+]
+
+HOURS = 24
+
+
+def _index_path(cube_path: str) -> str:
+    return os.path.splitext(cube_path)[0] + ".json"
+
+
+def build_cube(features: pd.DataFrame, cube_path: str,
+               metrics: Sequence[str] = CUBE_METRICS) -> "MetricsCube":
+    """Bin hourly feature rows into a memory-mapped cube and write its index."""
+    drivers = sorted(features["driver_id"].unique())
+    dates = pd.to_datetime(features["date"])
+    start = dates.min().date()
+    n_days = (dates.max().date() - start).days + 1
+
+    driver_codes = pd.Categorical(features["driver_id"], categories=drivers).codes.astype(np.int64)
+    day_offsets = (dates - pd.Timestamp(start)).dt.days.to_numpy(dtype=np.int64)
+    hours = features["hour"].to_numpy(dtype=np.int64)
+    cells = (driver_codes * n_days + day_offsets) * HOURS + hours
+
+    os.makedirs(os.path.dirname(cube_path) or ".", exist_ok=True)
+    shape = (len(drivers), n_days, HOURS, len(metrics))
+    cube = np.lib.format.open_memmap(cube_path, mode="w+", dtype=np.float32, shape=shape)
+    flat = cube.reshape(-1)
+    for m, metric in enumerate(metrics):
+        np.add.at(flat, cells * len(metrics) + m, features[metric].to_numpy(dtype=np.float32))
+    cube.flush()
+    del cube
+
+    index = {
+        "drivers": drivers,
+        "start_date": start.isoformat(),
+        "days": n_days,
+        "metrics": list(metrics),
+    }
+    with open(_index_path(cube_path), "w", encoding="utf-8") as f:
+        json.dump(index, f)
+    return MetricsCube.open(cube_path)
+
+
+class MetricsCube:
+    """Read-only, memory-mapped view of a cube written by build_cube."""
+
+    def __init__(self, data: np.ndarray, index: Dict):
+        self.data = data
+        self.drivers: List[str] = index["drivers"]
+        self.metrics: List[str] = index["metrics"]
+        self.start_date = date.fromisoformat(index["start_date"])
+        self.days = index["days"]
+        self._driver_offsets = {d: i for i, d in enumerate(self.drivers)}
+        self._metric_offsets = {m: i for i, m in enumerate(self.metrics)}
+
+    @classmethod
+    def open(cls, cube_path: str) -> "MetricsCube":
+        with open(_index_path(cube_path), "r", encoding="utf-8") as f:
+            index = json.load(f)
+        return cls(np.load(cube_path, mmap_mode="r"), index)
+
+    @property
+    def end_date(self) -> date:
+        return self.start_date + timedelta(days=self.days - 1)
+
+    def driver_offset(self, driver_id: str) -> int:
+        return self._driver_offsets[driver_id]
+
+    def metric_offset(self, metric: str) -> int:
+        return self._metric_offsets[metric]
+
+    def day_offset(self, day) -> int:
+        offset = (pd.Timestamp(day).date() - self.start_date).days
+        if not 0 <= offset < self.days:
+            raise KeyError(f"{day} outside cube range {self.start_date}..{self.end_date}")
+        return offset
+
+    def weekday_offsets(self, weekday: int, count: int, as_of=None) -> np.ndarray:
+        """Day offsets of the last `count` given weekdays (0=Mon) on or before as_of."""
+        last = self.days - 1 if as_of is None else self.day_offset(as_of)
+        first_weekday = self.start_date.weekday()
+        latest = last - ((first_weekday + last - weekday) % 7)
+        offsets = np.arange(latest, -1, -7)[:count]
+        return offsets[::-1]
+
+    def values(self, driver_id: str, metric: str,
+               days: Optional[Iterable] = None,
+               hours: Optional[Iterable[int]] = None) -> np.ndarray:
+        """
+        Slice one driver's metric as a (day, hour) array.
+
+        days may be dates or integer offsets; None selects every day/hour.
+        """
+        day_idx = slice(None)
+        if days is not None:
+            day_idx = np.array([d if isinstance(d, (int, np.integer)) else self.day_offset(d) for d in days],
+                               dtype=np.intp)
+        hour_idx = slice(None) if hours is None else np.asarray(list(hours), dtype=np.intp)
+        driver_slab = self.data[self.driver_offset(driver_id), :, :, self.metric_offset(metric)]
+        return driver_slab[day_idx][:, hour_idx]
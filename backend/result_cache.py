@@ -0,0 +1,146 @@
+"""
+Memoization for engine entry points, keyed on driver data version.
+
+A driver's results only change when that driver's data is (re)loaded, so
+results are cached under (function, driver_id, args, data version):
+
+    cache = ResultCache(max_bytes=32 * 2**20, ttl=300, version_source=store.data_version)
+    cache.call(store.get_volatility_trend, driver_id, weeks)
+
+The version source is whatever owns the data and bumps a driver's version
+each time it loads that driver (DataVersions); old entries then stop
+matching and age out of the LRU. Only cache functions whose result depends
+on the one driver: anything ranked against the fleet (percentiles) goes
+stale when other drivers change. Cached results are shared between callers
+and must be treated as read-only.
+"""
+
+import sys
+import threading
+import time
+from collections import OrderedDict
+from typing import Any, Callable, Dict, Hashable, Optional
+
+import numpy as np
+
+
+def deep_sizeof(value: Any) -> int:
+    """Approximate bytes held by a result (dicts, lists, scalars, numpy arrays)."""
+    if isinstance(value, np.ndarray):
+        return sys.getsizeof(value) + (0 if value.base is not None else value.nbytes)
+    size = sys.getsizeof(value)
+    if isinstance(value, dict):
+        size += sum(deep_sizeof(k) + deep_sizeof(v) for k, v in value.items())
+    elif isinstance(value, (list, tuple, set, frozenset)):
+        size += sum(deep_sizeof(v) for v in value)
+    return size
+
+
+class DataVersions:
+    """In-process version counters; bump(driver_id) whenever a driver's data changes."""
+
+    def __init__(self):
+        self._versions: Dict[str, int] = {}
+        self._lock = threading.Lock()
+
+    def __call__(self, driver_id: str) -> int:
+        return self._versions.get(driver_id, 0)
+
+    def bump(self, driver_id: str) -> int:
+        with self._lock:
+            self._versions[driver_id] = self._versions.get(driver_id, 0) + 1
+            return self._versions[driver_id]
+
+
+class ResultCache:
+    """
+    Thread-safe LRU of function results under a byte budget, with optional TTL.
+
+    Exposes hits / misses / evictions / expirations counters and stats().
+    """
+
+    def __init__(self, max_bytes: int = 64 * 2**20, ttl: Optional[float] = None,
+                 version_source: Optional[Callable[[str], Hashable]] = None,
+                 clock: Callable[[], float] = time.monotonic):
+        self.max_bytes = max_bytes
+        self.ttl = ttl
+        self.versions = version_source or DataVersions()
+        self.clock = clock
+        self.hits = 0
+        self.misses = 0
+        self.evictions = 0
+        self.expirations = 0
+        self.current_bytes = 0
+        # key -> (result, size, expires_at)
+        self._entries: "OrderedDict[Hashable, tuple]" = OrderedDict()
+        self._lock = threading.Lock()
+
+    def __len__(self) -> int:
+        return len(self._entries)
+
+    def key(self, func: Callable, driver_id: str, args: tuple, kwargs: dict) -> Hashable:
+        name = f"{func.__module__}.{func.__qualname__}"
+        return (name, driver_id, args, tuple(sorted(kwargs.items())), self.versions(driver_id))
+
+    def call(self, func: Callable, driver_id: str, *args, **kwargs):
+        """func(driver_id, *args, **kwargs), served from cache when the driver's data is unchanged."""
+        key = self.key(func, driver_id, args, kwargs)
+        with self._lock:
+            entry = self._entries.get(key)
+            if entry is not None:
+                if entry[2] is not None and self.clock() >= entry[2]:
+                    self._drop(key)
+                    self.expirations += 1
+                else:
+                    self._entries.move_to_end(key)
+                    self.hits += 1
+                    return entry[0]
+            self.misses += 1
+
+        # Compute outside the lock; concurrent misses on one key may both compute
+        result = func(driver_id, *args, **kwargs)
+        size = deep_sizeof(result)
+        if size > self.max_bytes:
+            return result
+        expires_at = self.clock() + self.ttl if self.ttl is not None else None
+        with self._lock:
+            if key in self._entries:
+                self._drop(key)
+            self._entries[key] = (result, size, expires_at)
+            self.current_bytes += size
+            while self.current_bytes > self.max_bytes:
+                self._drop(next(iter(self._entries)))
+                self.evictions += 1
+        return result
+
+    def memoize(self, func: Callable) -> Callable:
+        """Decorator form of call() for functions taking driver_id first."""
+        def wrapper(driver_id, *args, **kwargs):
+            return self.call(func, driver_id, *args, **kwargs)
+        wrapper.__name__ = func.__name__
+        wrapper.__qualname__ = func.__qualname__
+        wrapper.__doc__ = func.__doc__
+        wrapper.__wrapped__ = func
+        return wrapper
+
+    def _drop(self, key: Hashable):
+        _, size, _ = self._entries.pop(key)
+        self.current_bytes -= size
+
+    def clear(self):
+        with self._lock:
+            self._entries.clear()
+            self.current_bytes = 0
+
+    def stats(self) -> Dict[str, Any]:
+        lookups = self.hits + self.misses
+        return {
+            "hits": self.hits,
+            "misses": self.misses,
+            "hit_rate": round(self.hits / lookups, 4) if lookups else 0.0,
+            "evictions": self.evictions,
+            "expirations": self.expirations,
+            "entries": len(self._entries),
+            "bytes": self.current_bytes,
+            "max_bytes": self.max_bytes,
+        }
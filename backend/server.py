@@ -5,21 +5,35 @@ from flask import Flask, jsonify, request
 from flask_cors import CORS
 import forecast_engine as forecast
 import insights_engine as insights
-import steadiness_engine as steadiness
 import recommendation_engine as recommendations
-import feature_builder as features
+import features_engine as features
+from data_store import DataStore
+from result_cache import ResultCache
+from steadiness_engine import Period
 
 app = Flask(__name__)
 CORS(app)  # Allow all origins for development
 
+# Driver data shared by all routes: the steadiness engine is restored at
+# startup; trips and hourly features load per driver on first use. The
+# forecast, insights and recommendation engines are still placeholder
+# modules that return fixed data and read no files.
+store = DataStore(data_dir="data", feature_store_dir="features/store", features_dir="features",
+                  snapshot_path="features/steadiness.snap").preload()
+
+# Per-driver results only change when the store (re)loads that driver, so
+# repeat dashboard polls are served from memory. Percentile-bearing results
+# (steadiness score) depend on the whole fleet and are not cached.
+cache = ResultCache(max_bytes=64 * 2**20, ttl=15 * 60, version_source=store.data_version)
+
 # HOME TAB ROUTES
 @app.route('/api/home/overview', methods=['GET'])
 def get_home_overview():
     """Combined data for home dashboard"""
     driver_id = request.args.get('driver_id', 'D0001')
     return jsonify({
-        "forecast": forecast.get_weekly_forecast(driver_id, "2026-10-20"),
-        "steadiness": steadiness.get_steadiness_score(driver_id),
+        "forecast": cache.call(forecast.get_weekly_forecast, driver_id, "2026-10-20"),
+        "steadiness": store.get_steadiness_score(driver_id),
         "goal_progress": recommendations.get_goal_progress(driver_id)
     })
 
@@ -28,59 +42,62 @@ def get_home_overview():
 def get_weekly_forecast():
     driver_id = request.args.get('driver_id', 'D0001')
     week = request.args.get('week', '2026-10-20')
-    return jsonify(forecast.get_weekly_forecast(driver_id, week))
+    return jsonify(cache.call(forecast.get_weekly_forecast, driver_id, week))
 
 @app.route('/api/forecast/chart', methods=['GET'])
 def get_forecast_chart():
     driver_id = request.args.get('driver_id', 'D0001')
     weeks = int(request.args.get('weeks', 8))
-    return jsonify(forecast.get_forecast_chart_data(driver_id, weeks))
+    return jsonify(cache.call(forecast.get_forecast_chart_data, driver_id, weeks))
 
 @app.route('/api/forecast/daily', methods=['GET'])
 def get_daily_forecast():
     driver_id = request.args.get('driver_id', 'D0001')
     date = request.args.get('date', '2026-10-20')
-    return jsonify(forecast.get_daily_forecast(driver_id, date))
+    return jsonify(cache.call(forecast.get_daily_forecast, driver_id, date))
 
 # INSIGHTS TAB ROUTES
 @app.route('/api/insights/stability', methods=['GET'])
 def get_stability_metrics():
     driver_id = request.args.get('driver_id', 'D0001')
-    return jsonify(insights.get_income_stability_metrics(driver_id))
+    return jsonify(cache.call(insights.get_income_stability_metrics, driver_id))
 
 @app.route('/api/insights/peak-hours', methods=['GET'])
 def get_peak_hours():
     driver_id = request.args.get('driver_id', 'D0001')
-    return jsonify(insights.get_peak_hours_analysis(driver_id))
+    return jsonify(cache.call(insights.get_peak_hours_analysis, driver_id))
 
 @app.route('/api/insights/weather', methods=['GET'])
 def get_weather_impact():
     driver_id = request.args.get('driver_id', 'D0001')
-    return jsonify(insights.get_weather_impact_analysis(driver_id))
+    return jsonify(cache.call(insights.get_weather_impact_analysis, driver_id))
 
 @app.route('/api/insights/events', methods=['GET'])
 def get_events():
     driver_id = request.args.get('driver_id', 'D0001')
     days = int(request.args.get('days', 14))
-    return jsonify(insights.get_event_opportunities(driver_id, days))
+    return jsonify(cache.call(insights.get_event_opportunities, driver_id, days))
 
 # STEADINESS/TRADE TAB ROUTES
 @app.route('/api/steadiness/score', methods=['GET'])
 def get_steadiness():
     driver_id = request.args.get('driver_id', 'D0001')
     period = request.args.get('period', 'weekly')
-    return jsonify(steadiness.get_steadiness_score(driver_id, period))
+    periods = [p.value for p in Period]
+    if period not in periods:
+        return jsonify({"error": f"Unknown period {period!r}; expected one of {', '.join(periods)}"}), 400
+    return jsonify(store.get_steadiness_score(driver_id, period))
 
 @app.route('/api/steadiness/breakdown', methods=['GET'])
 def get_consistency():
     driver_id = request.args.get('driver_id', 'D0001')
-    return jsonify(steadiness.get_consistency_breakdown(driver_id))
+    return jsonify(cache.call(store.get_consistency_breakdown, driver_id))
 
 @app.route('/api/steadiness/volatility', methods=['GET'])
 def get_volatility():
     driver_id = request.args.get('driver_id', 'D0001')
     weeks = int(request.args.get('weeks', 12))
-    return jsonify(steadiness.get_volatility_trend(driver_id, weeks))
+    return jsonify(cache.call(store.get_volatility_trend, driver_id, weeks))
 
 # RECOMMENDATIONS ROUTES
 @app.route('/api/recommendations/weekly', methods=['GET'])
@@ -119,12 +136,19 @@ def update_preferences():
 @app.route('/api/profile/data', methods=['GET'])
 def get_profile_data():
     driver_id = request.args.get('driver_id', 'D0001')
-    return jsonify(features.load_driver_data(driver_id))
+    profile = store.get_driver_profile(driver_id)
+    if profile is None:
+        return jsonify({"error": f"Unknown driver {driver_id}"}), 404
+    return jsonify(profile)
 
 # HEALTH CHECK
 @app.route('/api/health', methods=['GET'])
 def health_check():
     return jsonify({"status": "healthy", "message": "Steady API is running"})
 
+@app.route('/api/cache/stats', methods=['GET'])
+def cache_stats():
+    return jsonify(cache.stats())
+
 if __name__ == '__main__':
     app.run(debug=True, host='0.0.0.0', port=5000)
\ No newline at end of file
@@ -10,14 +10,22 @@ CV = (std_dev / mean) × 100
 Lower CV = Higher Steadiness = Better Financial Planning
 """
 
+import csv
+import json
+import mmap
+import os
+import struct
+import threading
 import numpy as np
 from datetime import datetime, timedelta
 from typing import Dict, List, Tuple, Optional, Union
 from dataclasses import dataclass, field
-from collections import Counter, defaultdict
+from collections import OrderedDict, deque
 from enum import Enum
 import statistics
 
+from quantile_sketch import KLLSketch
+
 
 class Period(Enum):
     """Time period aggregation options"""
@@ -78,6 +86,619 @@ class PeriodAggregate:
         return self.earnings / self.hours if self.hours > 0 else 0.0
 
 
+# =============================================================================
+# VECTORIZED PERIOD AGGREGATION
+# =============================================================================
+
+SECONDS_PER_DAY = 86400
+EPOCH_WEEKDAY = 3  # 1970-01-01 was a Thursday (Monday=0)
+
+
+def to_epoch_seconds(timestamps) -> np.ndarray:
+    """Naive datetimes (or datetime64 values) to int64 seconds since 1970-01-01"""
+    return np.asarray(timestamps, dtype="datetime64[s]").astype(np.int64)
+
+
+def as_epoch_seconds(value: Union[datetime, str, int, None]) -> int:
+    """
+    One point in time as epoch seconds
+    
+    Accepts a naive datetime, an ISO date/datetime string ("2025-09-30"),
+    epoch seconds, or None for now.
+    """
+    if value is None:
+        value = datetime.now()
+    if isinstance(value, (int, np.integer)):
+        return int(value)
+    return int(np.datetime64(value, "s").astype(np.int64))
+
+
+def period_keys(epoch_seconds: np.ndarray, period: str) -> np.ndarray:
+    """
+    Integer period key per timestamp
+    
+    daily: days since epoch; weekly: epoch day of the week's Monday;
+    monthly: months since 1970-01. Keys are monotonic in time, so sorted
+    timestamps give sorted keys.
+    """
+    period = Period(period)
+    days = np.floor_divide(epoch_seconds, SECONDS_PER_DAY)
+    if period is Period.DAILY:
+        return days
+    if period is Period.WEEKLY:
+        return days - (days + EPOCH_WEEKDAY) % 7
+    return epoch_seconds.astype("datetime64[s]").astype("datetime64[M]").astype(np.int64)
+
+
+def period_start(key: int, period: str) -> datetime:
+    """First instant of the period identified by key"""
+    if Period(period) is Period.MONTHLY:
+        return datetime(1970 + int(key) // 12, int(key) % 12 + 1, 1)
+    return datetime(1970, 1, 1) + timedelta(days=int(key))
+
+
+def period_label(key: int, period: str) -> str:
+    """Display label for a period key ("2025-09-15", "2025-W38", "2025-09")"""
+    start = period_start(key, period)
+    if Period(period) is Period.WEEKLY:
+        iso_year, iso_week, _ = start.isocalendar()
+        return f"{iso_year}-W{iso_week:02d}"
+    if Period(period) is Period.MONTHLY:
+        return start.strftime("%Y-%m")
+    return start.strftime("%Y-%m-%d")
+
+
+def aggregate_periods(epoch_seconds: np.ndarray, hours: np.ndarray, earnings: np.ndarray,
+                      period: str) -> Tuple[np.ndarray, np.ndarray, np.ndarray, np.ndarray]:
+    """
+    Reduce sessions to per-period totals in one pass
+    
+    Sorted input (the engine's invariant) is reduced with np.add.reduceat over
+    run boundaries; unsorted input falls back to np.unique + np.bincount.
+    
+    Returns:
+        (keys, earnings, hours, session_counts) with one entry per period
+        that has at least one session, in key order
+    """
+    keys = period_keys(epoch_seconds, period)
+    if len(keys) == 0:
+        empty = np.empty(0)
+        return keys, empty, empty, np.empty(0, dtype=np.int64)
+    
+    if np.all(keys[1:] >= keys[:-1]):
+        starts = np.flatnonzero(np.r_[True, keys[1:] != keys[:-1]])
+        counts = np.diff(np.r_[starts, len(keys)])
+        return (
+            keys[starts],
+            np.add.reduceat(np.asarray(earnings, dtype=np.float64), starts),
+            np.add.reduceat(np.asarray(hours, dtype=np.float64), starts),
+            counts,
+        )
+    
+    unique_keys, inverse = np.unique(keys, return_inverse=True)
+    return (
+        unique_keys,
+        np.bincount(inverse, weights=earnings, minlength=len(unique_keys)),
+        np.bincount(inverse, weights=hours, minlength=len(unique_keys)),
+        np.bincount(inverse, minlength=len(unique_keys)),
+    )
+
+
+def rolling_cv(values: np.ndarray, window: int) -> np.ndarray:
+    """
+    Coefficient of variation (%) of every length-`window` run along the last axis
+    
+    One O(n) sweep over prefix sums of x and x², independent of the window
+    length; works on a single series or a (drivers, periods) matrix. Values
+    are centred on their series mean first so the x² prefix sums do not
+    cancel catastrophically. Windows with a non-positive mean give 0.
+    
+    Returns:
+        Array with the last axis shortened to n - window + 1 (empty if n < window)
+    """
+    values = np.asarray(values, dtype=np.float64)
+    n = values.shape[-1]
+    if window < 2 or n < window:
+        return np.zeros(values.shape[:-1] + (max(0, n - window + 1),))
+    
+    shift = values.mean(axis=-1, keepdims=True)
+    centred = values - shift
+    pad = [(0, 0)] * (values.ndim - 1) + [(1, 0)]
+    prefix = np.pad(np.cumsum(centred, axis=-1), pad)
+    prefix_sq = np.pad(np.cumsum(centred * centred, axis=-1), pad)
+    
+    window_sum = prefix[..., window:] - prefix[..., :-window]
+    window_sq = prefix_sq[..., window:] - prefix_sq[..., :-window]
+    variance = np.maximum(window_sq - window_sum * window_sum / window, 0) / (window - 1)
+    mean = window_sum / window + shift
+    return np.divide(np.sqrt(variance) * 100, mean, out=np.zeros_like(mean), where=mean > 0)
+
+
+def zone_entropy_bits(zone_counts: np.ndarray) -> np.ndarray:
+    """
+    Shannon entropy (bits) of zone visit counts along the last axis
+    
+    zone_counts is a bincount over zone codes: one driver's (zones,) vector
+    or a (drivers, zones) matrix. Empty rows have entropy 0.
+    """
+    counts = np.asarray(zone_counts, dtype=np.float64)
+    totals = counts.sum(axis=-1, keepdims=True)
+    probs = np.divide(counts, totals, out=np.zeros_like(counts), where=totals > 0)
+    log_probs = np.log2(probs, out=np.zeros_like(probs), where=probs > 0)
+    return -(probs * log_probs).sum(axis=-1)
+
+
+# =============================================================================
+# COLUMNAR SESSION STORE
+# =============================================================================
+
+DEFAULT_ZONES_CSV = os.path.join(os.path.dirname(os.path.abspath(__file__)), "data", "zones.csv")
+
+
+class ZoneInterner:
+    """
+    Maps zone names to small integer codes shared by every driver in an engine
+    
+    Session zones are stored as codes so a visit costs 4 bytes instead of a
+    Python string reference, and zone histograms are a bincount.
+    from_csv() fixes the city's zones to codes 0..n-1 in zones.csv order;
+    zones not in the file get the next free code when first seen.
+    """
+    
+    def __init__(self, names: Optional[List[str]] = None):
+        self.names: List[str] = []
+        self._ids: Dict[str, int] = {}
+        for name in names or []:
+            self.intern(name)
+    
+    @classmethod
+    def from_csv(cls, path: str) -> "ZoneInterner":
+        """
+        Codes from data/zones.csv: row order of zone_id, with each zone_name
+        accepted as an alias for the same code
+        """
+        with open(path, newline="", encoding="utf-8") as f:
+            rows = list(csv.DictReader(f))
+        interner = cls([row["zone_id"] for row in rows])
+        for row in rows:
+            if row.get("zone_name"):
+                interner.alias(row["zone_name"], row["zone_id"])
+        return interner
+    
+    def __len__(self) -> int:
+        return len(self.names)
+    
+    def alias(self, name: str, zone: str):
+        """Make name resolve to the existing code of zone"""
+        self._ids.setdefault(name, self._ids[zone])
+    
+    def aliases(self) -> Dict[str, int]:
+        """Names other than a zone's own that resolve to its code"""
+        return {name: code for name, code in self._ids.items() if self.names[code] != name}
+    
+    def intern(self, name: str) -> int:
+        """Id for name, assigning the next id the first time it is seen"""
+        zone_id = self._ids.get(name)
+        if zone_id is None:
+            zone_id = self._ids[name] = len(self.names)
+            self.names.append(name)
+        return zone_id
+    
+    def intern_many(self, names: List[str]) -> np.ndarray:
+        return np.fromiter((self.intern(n) for n in names), dtype=np.int32, count=len(names))
+    
+    def lookup(self, zone_ids: np.ndarray) -> List[str]:
+        return [self.names[i] for i in np.asarray(zone_ids).tolist()]
+
+
+def _csr_take(offsets: np.ndarray, values: np.ndarray,
+              rows: np.ndarray) -> Tuple[np.ndarray, np.ndarray]:
+    """Gather CSR rows (in the given order) into a new (offsets, values) pair"""
+    lengths = np.diff(offsets)[rows]
+    new_offsets = np.zeros(len(rows) + 1, dtype=offsets.dtype)
+    np.cumsum(lengths, out=new_offsets[1:])
+    shift = np.repeat(offsets[:-1][rows] - new_offsets[:-1], lengths)
+    return new_offsets, values[np.arange(new_offsets[-1]) + shift]
+
+
+@dataclass
+class SessionArrays:
+    """
+    One driver's sessions as parallel arrays (struct-of-arrays)
+    
+    Sessions are sorted by timestamp. Zones are CSR-encoded: the zones of
+    session i are zone_ids[zone_offsets[i]:zone_offsets[i + 1]], so any
+    contiguous run of sessions owns a contiguous run of zone ids.
+    
+    About 28 bytes per session (plus 4 per zone visit), against several
+    hundred for a DriverSession with its own zones list.
+    """
+    timestamps: np.ndarray    # int64 epoch seconds, ascending
+    hours: np.ndarray         # float32
+    earnings: np.ndarray      # float32
+    zone_offsets: np.ndarray  # int32, len(sessions) + 1
+    zone_ids: np.ndarray      # int32 ids from the engine's ZoneInterner
+    
+    def __len__(self) -> int:
+        return len(self.timestamps)
+    
+    @classmethod
+    def empty(cls) -> "SessionArrays":
+        return cls(
+            np.empty(0, dtype=np.int64), np.empty(0, dtype=np.float32),
+            np.empty(0, dtype=np.float32), np.zeros(1, dtype=np.int32),
+            np.empty(0, dtype=np.int32),
+        )
+    
+    @classmethod
+    def from_arrays(cls, timestamps, hours, earnings, zone_ids=None,
+                    zone_offsets=None) -> "SessionArrays":
+        """
+        Build from column arrays, sorting by timestamp if needed
+        
+        Args:
+            timestamps: datetimes, datetime64 values or int64 epoch seconds
+            hours: Hours worked per session
+            earnings: Earnings per session
+            zone_ids: Interned zone ids, CSR-encoded with zone_offsets
+                (omit both for sessions without zone data)
+            zone_offsets: len(sessions) + 1 row offsets into zone_ids
+        """
+        timestamps = np.asarray(timestamps)
+        if timestamps.dtype.kind != "i":
+            timestamps = to_epoch_seconds(timestamps)
+        timestamps = timestamps.astype(np.int64, copy=False)
+        hours = np.asarray(hours, dtype=np.float32)
+        earnings = np.asarray(earnings, dtype=np.float32)
+        if zone_ids is None:
+            zone_ids = np.empty(0, dtype=np.int32)
+            zone_offsets = np.zeros(len(timestamps) + 1, dtype=np.int32)
+        zone_ids = np.asarray(zone_ids, dtype=np.int32)
+        zone_offsets = np.asarray(zone_offsets, dtype=np.int32)
+        if not (len(timestamps) == len(hours) == len(earnings) == len(zone_offsets) - 1):
+            raise ValueError("Session columns must have equal length (zone_offsets one longer)")
+        
+        if np.any(timestamps[1:] < timestamps[:-1]):
+            order = np.argsort(timestamps, kind="stable")
+            timestamps, hours, earnings = timestamps[order], hours[order], earnings[order]
+            zone_offsets, zone_ids = _csr_take(zone_offsets, zone_ids, order)
+        return cls(timestamps, hours, earnings, zone_offsets, zone_ids)
+    
+    @classmethod
+    def from_sessions(cls, sessions: List[DriverSession],
+                      interner: ZoneInterner) -> "SessionArrays":
+        """Convert DriverSession objects, interning their zone names"""
+        zone_counts = np.fromiter((len(s.zones) for s in sessions), dtype=np.int32, count=len(sessions))
+        zone_offsets = np.zeros(len(sessions) + 1, dtype=np.int32)
+        np.cumsum(zone_counts, out=zone_offsets[1:])
+        return cls.from_arrays(
+            to_epoch_seconds([s.timestamp for s in sessions]),
+            [s.hours_worked for s in sessions],
+            [s.earnings for s in sessions],
+            interner.intern_many([z for s in sessions for z in s.zones]),
+            zone_offsets,
+        )
+    
+    @classmethod
+    def concat(cls, parts: List["SessionArrays"]) -> "SessionArrays":
+        """Join session stores (re-sorting if the parts overlap in time)"""
+        parts = [p for p in parts if len(p)]
+        if not parts:
+            return cls.empty()
+        zone_offsets = [np.zeros(1, dtype=np.int32)]
+        base = 0
+        for part in parts:
+            zone_offsets.append(part.zone_offsets[1:] + base)
+            base += int(part.zone_offsets[-1])
+        return cls.from_arrays(
+            np.concatenate([p.timestamps for p in parts]),
+            np.concatenate([p.hours for p in parts]),
+            np.concatenate([p.earnings for p in parts]),
+            np.concatenate([p.zone_ids for p in parts]),
+            np.concatenate(zone_offsets),
+        )
+    
+    def slice(self, start: int, stop: int) -> "SessionArrays":
+        """Sessions start..stop-1 as views (zone offsets rebased to 0)"""
+        z0, z1 = self.zone_offsets[start], self.zone_offsets[stop]
+        return SessionArrays(
+            self.timestamps[start:stop], self.hours[start:stop], self.earnings[start:stop],
+            self.zone_offsets[start:stop + 1] - z0, self.zone_ids[z0:z1],
+        )
+    
+    def window(self, start: Optional[int] = None, end: Optional[int] = None) -> "SessionArrays":
+        """
+        Sessions with start <= timestamp < end (epoch seconds), as views
+        
+        Both bounds are binary searches over the sorted timestamps; None
+        leaves that side open.
+        """
+        first = 0 if start is None else int(np.searchsorted(self.timestamps, start, side="left"))
+        last = len(self) if end is None else int(np.searchsorted(self.timestamps, end, side="left"))
+        return self.slice(first, max(first, last))
+    
+    def since(self, epoch_seconds: int) -> "SessionArrays":
+        """Sessions at or after the given time"""
+        return self.window(start=epoch_seconds)
+    
+    def earnings_per_hour(self) -> np.ndarray:
+        """$/hr for sessions with hours worked > 0"""
+        worked = self.hours > 0
+        return self.earnings[worked].astype(np.float64) / self.hours[worked]
+    
+    def nbytes(self) -> int:
+        return sum(a.nbytes for a in (self.timestamps, self.hours, self.earnings,
+                                      self.zone_offsets, self.zone_ids))
+
+
+# =============================================================================
+# SNAPSHOTS
+# =============================================================================
+
+SNAPSHOT_MAGIC = b"STDYSNAP"
+SNAPSHOT_VERSION = 1
+_SNAPSHOT_PREAMBLE = struct.Struct("<8sIQ")  # magic, format version, header bytes
+_SNAPSHOT_ALIGN = 64
+
+
+def _write_snapshot(path: str, header: Dict, arrays: Dict[str, np.ndarray]):
+    """
+    Write arrays to a snapshot file: preamble, JSON header, aligned raw arrays
+    
+    Each array starts on a 64-byte boundary so a reader can map it in place.
+    Written to a temporary file and renamed, so readers never see a partial
+    snapshot.
+    """
+    layout, offset = {}, 0
+    for name, array in arrays.items():
+        offset = -(-offset // _SNAPSHOT_ALIGN) * _SNAPSHOT_ALIGN
+        layout[name] = {"dtype": array.dtype.str, "shape": list(array.shape), "offset": offset}
+        offset += array.nbytes
+    header_bytes = json.dumps(dict(header, arrays=layout)).encode("utf-8")
+    data_start = -(-(_SNAPSHOT_PREAMBLE.size + len(header_bytes)) // _SNAPSHOT_ALIGN) * _SNAPSHOT_ALIGN
+    
+    tmp_path = f"{path}.tmp"
+    with open(tmp_path, "wb") as f:
+        f.write(_SNAPSHOT_PREAMBLE.pack(SNAPSHOT_MAGIC, SNAPSHOT_VERSION, len(header_bytes)))
+        f.write(header_bytes)
+        for name, array in arrays.items():
+            f.seek(data_start + layout[name]["offset"])
+            f.write(np.ascontiguousarray(array).tobytes())
+        f.truncate(data_start + offset)
+    os.replace(tmp_path, path)
+
+
+def _read_snapshot_header(f, path: str) -> Tuple[Dict, int]:
+    """JSON header of an open snapshot file and the offset where its arrays start"""
+    magic, version, header_size = _SNAPSHOT_PREAMBLE.unpack(f.read(_SNAPSHOT_PREAMBLE.size))
+    if magic != SNAPSHOT_MAGIC:
+        raise ValueError(f"{path} is not a steadiness snapshot")
+    if version != SNAPSHOT_VERSION:
+        raise ValueError(f"{path} has snapshot format {version}, expected {SNAPSHOT_VERSION}")
+    header = json.loads(f.read(header_size))
+    return header, -(-(_SNAPSHOT_PREAMBLE.size + header_size) // _SNAPSHOT_ALIGN) * _SNAPSHOT_ALIGN
+
+
+def snapshot_header(path: str) -> Dict:
+    """A snapshot's header (city, params, drivers, sources...) without mapping its arrays"""
+    with open(path, "rb") as f:
+        header, _ = _read_snapshot_header(f, path)
+    header.pop("arrays")
+    return header
+
+
+def _map_snapshot(path: str) -> Tuple[Dict, Dict[str, np.ndarray]]:
+    """
+    Header and read-only arrays of a snapshot file, mapped rather than read
+    
+    The arrays share one mmap of the file; pages are loaded on first touch.
+    """
+    with open(path, "rb") as f:
+        header, data_start = _read_snapshot_header(f, path)
+        mapped = mmap.mmap(f.fileno(), 0, access=mmap.ACCESS_READ)
+    
+    arrays = {}
+    for name, spec in header.pop("arrays").items():
+        dtype = np.dtype(spec["dtype"])
+        count = int(np.prod(spec["shape"]))
+        arrays[name] = np.frombuffer(mapped, dtype=dtype, count=count,
+                                     offset=data_start + spec["offset"]).reshape(spec["shape"])
+    return header, arrays
+
+
+# =============================================================================
+# INCREMENTAL (STREAMING) STATISTICS
+# =============================================================================
+
+PERIODS = [Period.DAILY, Period.WEEKLY, Period.MONTHLY]
+
+
+def session_period_keys(epoch_seconds: int) -> Tuple[int, int, int]:
+    """Scalar (daily, weekly, monthly) keys for one timestamp, matching period_keys"""
+    days = epoch_seconds // SECONDS_PER_DAY
+    day = datetime(1970, 1, 1) + timedelta(days=days)
+    return days, days - (days + EPOCH_WEEKDAY) % 7, (day.year - 1970) * 12 + day.month - 1
+
+
+class RunningMoments:
+    """
+    Welford running mean/variance that also supports removing values
+    
+    Lets a statistic follow a sliding window: values leaving the window
+    (or being replaced by an updated total) are removed in O(1).
+    """
+    __slots__ = ("count", "mean", "m2")
+    
+    def __init__(self):
+        self.count = 0
+        self.mean = 0.0
+        self.m2 = 0.0
+    
+    def add(self, value: float):
+        self.count += 1
+        delta = value - self.mean
+        self.mean += delta / self.count
+        self.m2 += delta * (value - self.mean)
+    
+    def remove(self, value: float):
+        if self.count <= 1:
+            self.count, self.mean, self.m2 = 0, 0.0, 0.0
+            return
+        previous_mean = (self.count * self.mean - value) / (self.count - 1)
+        self.m2 = max(0.0, self.m2 - (value - self.mean) * (value - previous_mean))
+        self.mean = previous_mean
+        self.count -= 1
+    
+    @property
+    def std_dev(self) -> float:
+        """Sample standard deviation (ddof=1), 0 with fewer than 2 values"""
+        return float(np.sqrt(self.m2 / (self.count - 1))) if self.count > 1 else 0.0
+    
+    @property
+    def cv(self) -> float:
+        """Coefficient of variation as a percentage"""
+        return self.std_dev / self.mean * 100 if self.count > 1 and self.mean > 0 else 0.0
+
+
+@dataclass
+class PeriodEarningsStats:
+    """Summary of per-period earnings that a steadiness score is derived from"""
+    sample_size: int
+    mean: float
+    std_dev: float
+    minimum: float
+    maximum: float
+    
+    @property
+    def cv(self) -> float:
+        return (self.std_dev / self.mean * 100) if self.mean > 0 else 0
+    
+    @classmethod
+    def from_values(cls, period_earnings: np.ndarray) -> "PeriodEarningsStats":
+        return cls(
+            sample_size=len(period_earnings),
+            mean=float(period_earnings.mean()),
+            std_dev=float(period_earnings.std(ddof=1)),
+            minimum=float(period_earnings.min()),
+            maximum=float(period_earnings.max()),
+        )
+
+
+class LiveDriverStats:
+    """
+    Streaming steadiness state for one driver over a trailing window
+    
+    Appending a session adds it to its daily, weekly and monthly period
+    totals and swaps the old total for the new one in a RunningMoments per
+    period; sessions older than the window are replayed with the opposite
+    sign. Scores and breakdowns then read the moments without touching
+    session history. Sessions must arrive in timestamp order.
+    """
+    
+    def __init__(self, window_seconds: int):
+        self.window_seconds = window_seconds
+        # (timestamp, hours, earnings, zone_ids, period keys) in arrival order
+        self.sessions: deque = deque()
+        self.period_totals: Dict[Period, Dict[int, Tuple[float, float, int]]] = {p: {} for p in PERIODS}
+        self.earnings_moments = {p: RunningMoments() for p in PERIODS}
+        self.hours_moments = {p: RunningMoments() for p in PERIODS}
+        self.eph_moments = RunningMoments()
+        self.zone_counts = np.zeros(0, dtype=np.int64)  # bincount over zone codes
+    
+    def __len__(self) -> int:
+        return len(self.sessions)
+    
+    def add_session(self, epoch_seconds: int, hours: float, earnings: float,
+                    zone_ids: Tuple[int, ...] = ()):
+        if self.sessions and epoch_seconds < self.sessions[-1][0]:
+            raise ValueError("Live sessions must be appended in timestamp order")
+        session = (epoch_seconds, float(hours), float(earnings), tuple(zone_ids),
+                   session_period_keys(epoch_seconds))
+        self.sessions.append(session)
+        self._apply(session, 1)
+    
+    def expire(self, cutoff_seconds: int):
+        """Drop sessions before cutoff_seconds from every statistic"""
+        while self.sessions and self.sessions[0][0] < cutoff_seconds:
+            self._apply(self.sessions.popleft(), -1)
+    
+    def _apply(self, session: Tuple, sign: int):
+        _, hours, earnings, zone_ids, keys = session
+        for period, key in zip(PERIODS, keys):
+            totals = self.period_totals[period]
+            old_earnings, old_hours, old_count = totals.get(key, (0.0, 0.0, 0))
+            if old_count:
+                self.earnings_moments[period].remove(old_earnings)
+                self.hours_moments[period].remove(old_hours)
+            count = old_count + sign
+            if count:
+                new_earnings, new_hours = old_earnings + sign * earnings, old_hours + sign * hours
+                totals[key] = (new_earnings, new_hours, count)
+                self.earnings_moments[period].add(new_earnings)
+                self.hours_moments[period].add(new_hours)
+            else:
+                del totals[key]
+        if hours > 0:
+            (self.eph_moments.add if sign > 0 else self.eph_moments.remove)(earnings / hours)
+        if zone_ids:
+            if max(zone_ids) >= len(self.zone_counts):
+                self.zone_counts = np.pad(self.zone_counts, (0, max(zone_ids) + 1 - len(self.zone_counts)))
+            np.add.at(self.zone_counts, list(zone_ids), sign)
+    
+    def earnings_stats(self, period: Period) -> PeriodEarningsStats:
+        moments = self.earnings_moments[period]
+        period_earnings = [total[0] for total in self.period_totals[period].values()]
+        return PeriodEarningsStats(
+            sample_size=moments.count,
+            mean=moments.mean,
+            std_dev=moments.std_dev,
+            minimum=min(period_earnings, default=0.0),
+            maximum=max(period_earnings, default=0.0),
+        )
+
+
+# Row layout of get_steadiness_scores_bulk (driver_id is widened to fit)
+SCORE_TABLE_FIELDS = [
+    ("score", np.int16),
+    ("percentile", np.int16),
+    ("cv", np.float64),
+    ("sample_size", np.int32),
+    ("mean_earnings", np.float64),
+    ("std_dev", np.float64),
+    ("min_earnings", np.float64),
+    ("max_earnings", np.float64),
+]
+
+
+@dataclass
+class FleetScoreIndex:
+    """
+    Sorted distribution of valid (> 0) steadiness scores for one period
+    
+    Built once per period over the whole fleet; a percentile is one
+    binary search instead of re-scoring every other driver.
+    """
+    sorted_scores: np.ndarray  # ascending
+    scores: Dict[str, int]     # driver_id -> score, valid scores only
+    day: Optional[int] = None  # epoch day a current-time index was built on
+    
+    def __len__(self) -> int:
+        return len(self.sorted_scores)
+    
+    def update(self, driver_id: str, score: float):
+        """Replace one driver's entry in place (scores <= 0 drop the driver)"""
+        previous = self.scores.pop(driver_id, None)
+        if previous is not None:
+            self.sorted_scores = np.delete(
+                self.sorted_scores, np.searchsorted(self.sorted_scores, previous, side="left")
+            )
+        if score > 0:
+            self.scores[driver_id] = int(score)
+            self.sorted_scores = np.insert(
+                self.sorted_scores, np.searchsorted(self.sorted_scores, score, side="left"), int(score)
+            )
+
+
 class SteadinessEngine:
     """
     Core engine for calculating driver income consistency metrics
@@ -92,6 +713,13 @@ class SteadinessEngine:
     - Standard deviation analysis for hours
     - Shannon Entropy for zone diversity
     - Rolling window volatility for trend analysis
+    
+    Thread safety: once loaded, an engine can serve read calls (scores,
+    breakdowns, trends, bulk tables) from many threads at once; the lazily
+    built fleet index and sketch caches, and in incremental mode the live
+    statistics that reads expire, are guarded by internal locks. Loading,
+    appending and invalidating sessions must not overlap with
+    other calls.
     """
     
     # Tuning parameters (calibrated for rideshare economics)
@@ -99,6 +727,10 @@ class SteadinessEngine:
     MAX_CV_FOR_SCORING = 40  # CV above 40% scores as 0
     MIN_SESSIONS_FOR_ANALYSIS = 4  # Minimum data points needed
     ROLLING_WINDOW_WEEKS = 4  # Window size for volatility trends
+    ANALYSIS_WINDOW_DAYS = 90  # Trailing history used for scores and breakdowns
+    TREND_CHANGE_THRESHOLD = 5  # CV points of change before a trend is called
+    COMPONENT_STRONG = 70  # Component score treated as a strength in insights
+    HISTORICAL_INDEX_LIMIT = 8  # Explicit-as_of fleet indexes / sketches kept (least recently used dropped)
     
     # Percentile thresholds for text generation
     PERCENTILE_EXCEPTIONAL = 90
@@ -106,43 +738,275 @@ class SteadinessEngine:
     PERCENTILE_AVERAGE = 50
     PERCENTILE_NEEDS_WORK = 25
     
-    def __init__(self, city: str = "Sydney"):
+    def __init__(self, city: str = "Sydney", incremental: bool = False,
+                 zones_csv: Optional[str] = DEFAULT_ZONES_CSV, city_zones: Optional[int] = None):
         """
         Initialize the Steadiness Engine
         
         Args:
             city: City name for comparative analysis (e.g., "Sydney", "Melbourne")
+            incremental: Keep streaming per-driver statistics (LiveDriverStats)
+                so append_session updates scores and breakdowns in O(1)
+                instead of recomputing them from session history
+            zones_csv: City zone list (zone_id,zone_name,...) used to intern
+                session zones; skipped if None or missing
+            city_zones: Number of city zones the zone entropy scale is based
+                on (default: the zones in zones_csv). Fixed for the engine's
+                lifetime, so zones first seen in session data never rescale
+                other drivers' scores
         """
         self.city = city
-        self._session_cache: Dict[str, List[DriverSession]] = {}
-        self._percentile_cache: Dict[str, List[float]] = {}
+        self.incremental = incremental
+        if zones_csv and os.path.exists(zones_csv):
+            self.zones = ZoneInterner.from_csv(zones_csv)
+        else:
+            self.zones = ZoneInterner()
+        self.city_zones = city_zones or len(self.zones)
+        self._session_cache: Dict[str, SessionArrays] = {}
+        self._pending_sessions: Dict[str, List[DriverSession]] = {}
+        self._live: Dict[str, LiveDriverStats] = {}
+        self._fleet_index: Dict[str, FleetScoreIndex] = {}
+        self._historical_index: "OrderedDict[Tuple[str, int], FleetScoreIndex]" = OrderedDict()
+        self._fleet_sketches: "OrderedDict[Union[str, Tuple[str, int]], KLLSketch]" = OrderedDict()
+        # Guards LRU upkeep of the caches above and folding in appended sessions
+        self._cache_lock = threading.Lock()
+        # Guards LiveDriverStats: reads expire sessions that left the window
+        self._live_lock = threading.Lock()
         
-    def load_driver_sessions(self, driver_id: str, sessions: List[DriverSession]):
+    def load_driver_sessions(self, driver_id: str,
+                             sessions: Union[List[DriverSession], SessionArrays]):
         """
         Load session data for a driver
         
+        Sessions are stored columnar (SessionArrays), sorted by timestamp.
+        
         Args:
             driver_id: Unique driver identifier
-            sessions: List of DriverSession objects
+            sessions: List of DriverSession objects, or a SessionArrays whose
+                zone_ids were interned through self.zones
         """
-        # Sort by timestamp for chronological analysis
-        self._session_cache[driver_id] = sorted(sessions, key=lambda s: s.timestamp)
+        if not isinstance(sessions, SessionArrays):
+            sessions = SessionArrays.from_sessions(sessions, self.zones)
+        self._session_cache[driver_id] = sessions
+        self._pending_sessions.pop(driver_id, None)
+        self.invalidate_fleet_index()
+        
+        if self.incremental:
+            self._seed_live_stats(driver_id, sessions)
+    
+    def _seed_live_stats(self, driver_id: str, sessions: SessionArrays):
+        """Start a driver's live statistics from the sessions in [now - window, now), as the batch path reads them"""
+        live = self._live[driver_id] = LiveDriverStats(self.ANALYSIS_WINDOW_DAYS * SECONDS_PER_DAY)
+        recent = sessions.window(*self._analysis_window())
+        offsets = recent.zone_offsets.tolist()
+        zone_ids = recent.zone_ids.tolist()
+        for i, (ts, hours, earnings) in enumerate(zip(recent.timestamps.tolist(),
+                                                      recent.hours.tolist(),
+                                                      recent.earnings.tolist())):
+            live.add_session(ts, hours, earnings, zone_ids[offsets[i]:offsets[i + 1]])
     
-    def load_bulk_sessions(self, sessions_by_driver: Dict[str, List[DriverSession]]):
+    def load_bulk_sessions(self, sessions_by_driver: Dict[str, Union[List[DriverSession], SessionArrays]]):
         """
         Load sessions for multiple drivers (for percentile calculations)
         
         Args:
             sessions_by_driver: Dict mapping driver_id to their sessions
+                (DriverSession lists or SessionArrays)
         """
         for driver_id, sessions in sessions_by_driver.items():
             self.load_driver_sessions(driver_id, sessions)
     
+    def append_session(self, driver_id: str, session: DriverSession):
+        """
+        Add one new session for a driver (streaming ingestion)
+        
+        In incremental mode the driver's live statistics and their entries in
+        any built fleet index are updated in place; otherwise the session is
+        buffered and the fleet index is invalidated. Either way the session
+        joins the columnar history on the next read that needs it.
+        
+        Raises:
+            ValueError: In incremental mode, if the session is older than the
+                driver's latest live session (nothing is recorded)
+        """
+        if self.incremental:
+            with self._live_lock:
+                live = self._live.get(driver_id)
+                if live is None:
+                    live = self._live[driver_id] = LiveDriverStats(self.ANALYSIS_WINDOW_DAYS * SECONDS_PER_DAY)
+                live.add_session(
+                    int(to_epoch_seconds(session.timestamp)),
+                    session.hours_worked,
+                    session.earnings,
+                    self.zones.intern_many(session.zones).tolist(),
+                )
+        
+        self._pending_sessions.setdefault(driver_id, []).append(session)
+        self._session_cache.setdefault(driver_id, SessionArrays.empty())
+        self._historical_index.clear()
+        if not self.incremental:
+            self.invalidate_fleet_index()
+            return
+        for period, index in self._fleet_index.items():
+            stats, _ = self._period_earnings_stats(driver_id, period)
+            index.update(driver_id, self._cv_to_steadiness_score(stats.cv) if stats else 0)
+    
+    def invalidate_fleet_index(self):
+        """Drop cached fleet score distributions (called whenever sessions change)"""
+        self._fleet_index.clear()
+        self._historical_index.clear()
+    
+    def _driver_sessions(self, driver_id: str) -> Optional[SessionArrays]:
+        """Columnar history for a driver, folding in any appended sessions"""
+        if driver_id in self._pending_sessions:
+            with self._cache_lock:
+                pending = self._pending_sessions.pop(driver_id, None)
+                if pending:
+                    self._session_cache[driver_id] = SessionArrays.concat([
+                        self._session_cache[driver_id],
+                        SessionArrays.from_sessions(pending, self.zones),
+                    ])
+        return self._session_cache.get(driver_id)
+    
+    def driver_ids(self) -> List[str]:
+        """Every driver with loaded sessions"""
+        return list(self._session_cache)
+    
+    def last_session_time(self) -> Optional[int]:
+        """Epoch seconds of the newest loaded session (None if there are none)"""
+        latest = [int(s.timestamps[-1]) for s in map(self._driver_sessions, list(self._session_cache)) if len(s)]
+        return max(latest, default=None)
+    
+    def _analysis_window(self, as_of=None) -> Tuple[int, int]:
+        """[start, end) epoch seconds of the trailing analysis window ending at as_of (default now)"""
+        end = as_epoch_seconds(as_of)
+        return end - self.ANALYSIS_WINDOW_DAYS * SECONDS_PER_DAY, end
+    
+    # =========================================================================
+    # SNAPSHOT / WARM START
+    # =========================================================================
+    
+    def _snapshot_params(self) -> Dict:
+        """Settings the cached fleet indexes depend on"""
+        return {
+            "analysis_window_days": self.ANALYSIS_WINDOW_DAYS,
+            "min_sessions": self.MIN_SESSIONS_FOR_ANALYSIS,
+            "cv_scaling_factor": self.CV_SCALING_FACTOR,
+            "max_cv": self.MAX_CV_FOR_SCORING,
+            "city_zones": self.city_zones,
+        }
+    
+    def save_snapshot(self, path: str, sources: Optional[Dict] = None):
+        """
+        Write the session cache and built fleet indexes to a binary snapshot
+        
+        Every driver's sessions go into one set of concatenated columns with
+        per-driver offsets; each built fleet index is stored as a score per
+        driver. Pending appended sessions are folded in first.
+        
+        Args:
+            path: Snapshot file (replaced atomically)
+            sources: Optional description of the input data (e.g. file
+                mtimes), stored in the header so a loader can tell whether
+                the snapshot is still current (see snapshot_header)
+        """
+        driver_ids = list(self._session_cache)
+        parts = [self._driver_sessions(d) for d in driver_ids]
+        session_offsets = np.zeros(len(parts) + 1, dtype=np.int64)
+        np.cumsum([len(p) for p in parts], out=session_offsets[1:])
+        zone_bases = np.zeros(len(parts) + 1, dtype=np.int64)
+        np.cumsum([len(p.zone_ids) for p in parts], out=zone_bases[1:])
+        
+        def column(name, dtype):
+            return np.concatenate([getattr(p, name) for p in parts]).astype(dtype, copy=False) if parts \
+                else np.empty(0, dtype=dtype)
+        
+        arrays = {
+            "session_offsets": session_offsets,
+            "zone_bases": zone_bases,
+            "timestamps": column("timestamps", np.int64),
+            "hours": column("hours", np.float32),
+            "earnings": column("earnings", np.float32),
+            # Per-driver zone offsets (each rebased to 0, len + 1 entries per driver)
+            "zone_offsets": column("zone_offsets", np.int32),
+            "zone_ids": column("zone_ids", np.int32),
+        }
+        for period, index in self._fleet_index.items():
+            arrays[f"fleet_{period}"] = np.array([index.scores.get(d, 0) for d in driver_ids], dtype=np.int16)
+        fleet_days = {period: index.day for period, index in self._fleet_index.items()}
+        
+        header = {
+            "city": self.city,
+            "created_at": as_epoch_seconds(None),
+            "params": self._snapshot_params(),
+            "drivers": driver_ids,
+            "fleet_days": fleet_days,
+            "zones": self.zones.names,
+            "zone_aliases": self.zones.aliases(),
+            "city_zones": self.city_zones,
+            "sources": sources,
+        }
+        _write_snapshot(path, header, arrays)
+    
+    @classmethod
+    def from_snapshot(cls, path: str, incremental: bool = False) -> "SteadinessEngine":
+        """
+        Warm-start an engine from a save_snapshot file
+        
+        Session columns are memory-mapped: each driver's SessionArrays are
+        read-only views into the file, so restore cost does not grow with
+        session count, and processes restoring the same file share pages.
+        Saved fleet indexes are reused unless the scoring settings changed.
+        In incremental mode live statistics are re-seeded from the sessions.
+        
+        Args:
+            path: Snapshot written by save_snapshot
+            incremental: As for SteadinessEngine()
+        
+        Returns:
+            SteadinessEngine with the snapshot's city, zones and drivers
+        """
+        header, arrays = _map_snapshot(path)
+        engine = cls(header["city"], incremental=incremental, zones_csv=None)
+        engine.zones = ZoneInterner(header["zones"])
+        for name, code in header["zone_aliases"].items():
+            engine.zones.alias(name, engine.zones.names[code])
+        engine.city_zones = header.get("city_zones") or len(engine.zones)
+        
+        driver_ids = header["drivers"]
+        bounds = arrays["session_offsets"].tolist()
+        zone_bases = arrays["zone_bases"].tolist()
+        timestamps, hours, earnings = arrays["timestamps"], arrays["hours"], arrays["earnings"]
+        zone_offsets, zone_ids = arrays["zone_offsets"], arrays["zone_ids"]
+        cache = engine._session_cache
+        for i, driver_id in enumerate(driver_ids):
+            a, b = bounds[i], bounds[i + 1]
+            cache[driver_id] = SessionArrays(
+                timestamps[a:b], hours[a:b], earnings[a:b],
+                zone_offsets[a + i:b + i + 1], zone_ids[zone_bases[i]:zone_bases[i + 1]],
+            )
+        
+        if header["params"] == engine._snapshot_params():
+            drivers = np.array(driver_ids, dtype=object)
+            for name, scores in arrays.items():
+                if name.startswith("fleet_"):
+                    period = name[len("fleet_"):]
+                    rated = scores > 0
+                    engine._fleet_index[period] = FleetScoreIndex(
+                        np.sort(scores[rated].astype(np.int64)),
+                        dict(zip(drivers[rated].tolist(), scores[rated].tolist())),
+                        header.get("fleet_days", {}).get(period),
+                    )
+        if incremental:
+            for driver_id, sessions in cache.items():
+                engine._seed_live_stats(driver_id, sessions)
+        return engine
+    
     # =========================================================================
     # CORE METRIC: STEADINESS SCORE
     # =========================================================================
     
-    def get_steadiness_score(self, driver_id: str, period: str = "weekly") -> Dict:
+    def get_steadiness_score(self, driver_id: str, period: str = "weekly", as_of=None) -> Dict:
         """
         Calculate overall steadiness/consistency score (0-100)
         
@@ -157,6 +1021,8 @@ class SteadinessEngine:
         Args:
             driver_id: Driver to analyze
             period: Aggregation period ("daily", "weekly", "monthly")
+            as_of: Score as of this time (datetime, ISO string or epoch
+                seconds) for deterministic replays; default now
         
         Returns:
             {
@@ -170,44 +1036,16 @@ class SteadinessEngine:
                 "std_dev": 242.25  # Standard deviation
             }
         """
-        # Validate inputs
-        if driver_id not in self._session_cache:
-            return self._empty_steadiness_response(period, "No session data found")
-        
-        sessions = self._session_cache[driver_id]
-        
-        # Filter to recent sessions (last 90 days for good sample size)
-        cutoff_date = datetime.now() - timedelta(days=90)
-        recent_sessions = [s for s in sessions if s.timestamp >= cutoff_date]
-        
-        if len(recent_sessions) < self.MIN_SESSIONS_FOR_ANALYSIS:
-            return self._empty_steadiness_response(
-                period, 
-                f"Need at least {self.MIN_SESSIONS_FOR_ANALYSIS} sessions"
-            )
-        
-        # Aggregate sessions by period
-        aggregates = self._aggregate_by_period(recent_sessions, period)
-        
-        if len(aggregates) < 2:
-            return self._empty_steadiness_response(
-                period,
-                f"Need at least 2 {period} periods"
-            )
-        
-        # Extract earnings for statistical analysis
-        earnings_list = [agg.earnings for agg in aggregates]
-        
-        # Calculate coefficient of variation
-        mean_earnings = statistics.mean(earnings_list)
-        std_dev = statistics.stdev(earnings_list)
-        cv = (std_dev / mean_earnings * 100) if mean_earnings > 0 else 0
+        stats, reason = self._period_earnings_stats(driver_id, period, as_of)
+        if stats is None:
+            return self._empty_steadiness_response(period, reason)
         
         # Convert CV to 0-100 steadiness score
+        cv = stats.cv
         score = self._cv_to_steadiness_score(cv)
         
         # Calculate percentile ranking
-        percentile = self._calculate_percentile(driver_id, score, period)
+        percentile = self._calculate_percentile(driver_id, score, period, as_of)
         
         # Generate human-readable comparison text
         comparison_text = self._generate_comparison_text(percentile)
@@ -218,15 +1056,180 @@ class SteadinessEngine:
             "comparison_text": comparison_text,
             "period": period,
             "cv": round(cv, 1),
-            "sample_size": len(aggregates),
-            "mean_earnings": round(mean_earnings, 2),
-            "std_dev": round(std_dev, 2),
+            "sample_size": stats.sample_size,
+            "mean_earnings": round(stats.mean, 2),
+            "std_dev": round(stats.std_dev, 2),
             "earnings_range": {
-                "min": round(min(earnings_list), 2),
-                "max": round(max(earnings_list), 2)
+                "min": round(stats.minimum, 2),
+                "max": round(stats.maximum, 2)
             }
         }
     
+    def get_steadiness_scores_bulk(self, driver_ids: Optional[List[str]] = None,
+                                   period: str = "weekly", as_of=None) -> np.recarray:
+        """
+        Steadiness scores for many drivers in one vectorized pass
+        
+        Same numbers as get_steadiness_score (unrounded), without the
+        comparison text. Drivers with too little data (or unknown ids) get
+        an all-zero row, like the empty single-driver response.
+        
+        Args:
+            driver_ids: Drivers to score (default: every loaded driver)
+            period: Aggregation period ("daily", "weekly", "monthly")
+            as_of: Score as of this time (default now), e.g. for backfills
+            
+        Returns:
+            Record array, one row per driver in input order, with fields
+            driver_id plus SCORE_TABLE_FIELDS
+        """
+        whole_fleet = driver_ids is None
+        driver_ids = list(self._session_cache) if whole_fleet else list(driver_ids)
+        table = self._score_table(driver_ids, period, as_of)
+        
+        if whole_fleet and as_of is None and self._current_fleet_index(period) is None:
+            self._fleet_index[period] = self._fleet_index_from_table(table, self._today())
+        
+        valid = table["sample_size"] > 0
+        percentile = self._rank_scores(table["score"], valid & (table["score"] > 0), period, as_of)
+        table["percentile"] = np.where(valid, percentile, 0)
+        return table.view(np.recarray)
+    
+    def _score_table(self, driver_ids: List[str], period: str, as_of=None) -> np.ndarray:
+        """
+        Score, CV and earnings stats for each driver (percentile left at 0)
+        
+        Recent sessions of all drivers are concatenated in driver order, so
+        (driver, period) runs are contiguous: one reduceat gives every
+        driver's per-period earnings and bincounts over the run owners give
+        the per-driver moments.
+        """
+        n = len(driver_ids)
+        width = max((len(d) for d in driver_ids), default=1)
+        table = np.zeros(n, dtype=[("driver_id", f"U{width}")] + SCORE_TABLE_FIELDS)
+        table["driver_id"] = driver_ids
+        if n == 0:
+            return table
+        
+        start, end = self._analysis_window(as_of)
+        empty = SessionArrays.empty()
+        recent = [(self._driver_sessions(d) or empty).window(start, end) for d in driver_ids]
+        session_counts = np.fromiter((len(r) for r in recent), dtype=np.int64, count=n)
+        owners = np.repeat(np.arange(n), session_counts)
+        timestamps = np.concatenate([r.timestamps for r in recent])
+        earnings = np.concatenate([r.earnings for r in recent]).astype(np.float64)
+        
+        keys = period_keys(timestamps, period)
+        starts = np.flatnonzero(np.r_[True, (owners[1:] != owners[:-1]) | (keys[1:] != keys[:-1])])
+        if len(keys) == 0:
+            starts = starts[:0]
+        run_owner = owners[starts]
+        run_earnings = np.add.reduceat(earnings, starts) if len(starts) else earnings[:0]
+        
+        periods = np.bincount(run_owner, minlength=n)
+        mean = np.bincount(run_owner, weights=run_earnings, minlength=n) / np.maximum(periods, 1)
+        deviation = run_earnings - mean[run_owner]
+        sum_sq = np.bincount(run_owner, weights=deviation * deviation, minlength=n)
+        std_dev = np.sqrt(sum_sq / np.maximum(periods - 1, 1))
+        cv = np.divide(std_dev * 100, mean, out=np.zeros(n), where=mean > 0)
+        
+        has_runs = periods > 0
+        first_run = np.r_[0, np.cumsum(periods)[:-1]][has_runs]
+        minimum = np.zeros(n)
+        maximum = np.zeros(n)
+        if len(run_earnings):
+            minimum[has_runs] = np.minimum.reduceat(run_earnings, first_run)
+            maximum[has_runs] = np.maximum.reduceat(run_earnings, first_run)
+        
+        # Same thresholds and CV → score mapping as the single-driver path
+        valid = (session_counts >= self.MIN_SESSIONS_FOR_ANALYSIS) & (periods >= 2)
+        score = np.clip(np.round(100 - np.minimum(cv, self.MAX_CV_FOR_SCORING) * self.CV_SCALING_FACTOR), 0, 100)
+        
+        table["score"] = np.where(valid, score, 0)
+        table["cv"] = np.where(valid, cv, 0)
+        table["sample_size"] = np.where(valid, periods, 0)
+        table["mean_earnings"] = np.where(valid, mean, 0)
+        table["std_dev"] = np.where(valid, std_dev, 0)
+        table["min_earnings"] = np.where(valid, minimum, 0)
+        table["max_earnings"] = np.where(valid, maximum, 0)
+        return table
+    
+    def _period_earnings_stats(self, driver_id: str, period: str,
+                               as_of=None) -> Tuple[Optional[PeriodEarningsStats], str]:
+        """
+        Per-period earnings summary over the trailing analysis window
+        
+        Read from the driver's live statistics in incremental mode (current
+        time only), otherwise aggregated from session history.
+        
+        Returns:
+            (stats, "") or (None, reason) when the driver has too little
+            data to score
+        """
+        live = self._live.get(driver_id) if as_of is None else None
+        if live is not None:
+            with self._live_lock:
+                live.expire(self._analysis_window()[0])
+                session_count = len(live)
+                stats = live.earnings_stats(Period(period))
+        else:
+            sessions = self._driver_sessions(driver_id)
+            if sessions is None:
+                return None, "No session data found"
+            
+            # Filter to recent sessions (last 90 days for good sample size)
+            recent_sessions = sessions.window(*self._analysis_window(as_of))
+            session_count = len(recent_sessions)
+            
+            # Aggregate sessions by period (vectorized; no per-period objects needed here)
+            _, period_earnings, _, _ = aggregate_periods(
+                recent_sessions.timestamps, recent_sessions.hours, recent_sessions.earnings, period
+            )
+            stats = PeriodEarningsStats.from_values(period_earnings) if len(period_earnings) >= 2 else None
+        
+        if session_count < self.MIN_SESSIONS_FOR_ANALYSIS:
+            return None, f"Need at least {self.MIN_SESSIONS_FOR_ANALYSIS} sessions"
+        if stats is None or stats.sample_size < 2:
+            return None, f"Need at least 2 {period} periods"
+        return stats, ""
+    
+    def _aggregate_by_period(self, sessions: SessionArrays,
+                             period: str) -> List[PeriodAggregate]:
+        """
+        Group sessions into daily/weekly/monthly PeriodAggregates
+        
+        Totals come from aggregate_periods. Sessions are sorted, so each
+        period is a contiguous run of sessions and, through the CSR offsets,
+        a contiguous run of zone ids.
+        
+        Args:
+            sessions: Sessions sorted by timestamp
+            period: "daily", "weekly" or "monthly"
+            
+        Returns:
+            One PeriodAggregate per period with sessions, oldest first
+        """
+        if len(sessions) == 0:
+            return []
+        
+        keys, earnings, hours, counts = aggregate_periods(
+            sessions.timestamps, sessions.hours, sessions.earnings, period
+        )
+        run_ends = np.cumsum(counts)
+        zone_bounds = sessions.zone_offsets[np.r_[0, run_ends]].tolist()
+        
+        return [
+            PeriodAggregate(
+                period_key=period_start(key, period),
+                period_label=period_label(key, period),
+                earnings=float(e),
+                hours=float(h),
+                sessions_count=int(c),
+                zones=self.zones.lookup(sessions.zone_ids[zone_bounds[i]:zone_bounds[i + 1]]),
+            )
+            for i, (key, e, h, c) in enumerate(zip(keys.tolist(), earnings, hours, counts))
+        ]
+    
     def _cv_to_steadiness_score(self, cv: float) -> int:
         """
         Convert coefficient of variation to 0-100 steadiness score
@@ -252,7 +1255,7 @@ class SteadinessEngine:
         return max(0, min(100, int(round(score))))
     
     def _calculate_percentile(self, driver_id: str, score: float, 
-                             period: str) -> int:
+                             period: str, as_of=None) -> int:
         """
         Calculate percentile ranking vs other drivers in same city
         
@@ -260,39 +1263,132 @@ class SteadinessEngine:
             driver_id: Driver being analyzed
             score: Their steadiness score
             period: Time period used
+            as_of: Rank against the fleet as of this time (default now)
             
         Returns:
             Percentile (0-100) representing "better than X% of drivers"
         """
-        # Calculate scores for all other drivers
-        cache_key = f"{self.city}_{period}"
+        # A scored driver (> 0) is part of the distribution it is ranked against
+        return int(self._rank_scores(np.array([score]), np.array([score > 0]), period, as_of)[0])
+    
+    def _rank_scores(self, scores: np.ndarray, in_distribution: np.ndarray,
+                     period: str, as_of=None) -> np.ndarray:
+        """
+        Percentile of each score against every *other* driver's score
         
-        if cache_key not in self._percentile_cache:
-            all_scores = []
-            
-            for other_id in self._session_cache.keys():
-                if other_id == driver_id:
-                    continue
-                
-                # Get their steadiness score
-                result = self.get_steadiness_score(other_id, period)
-                if result["score"] > 0:  # Valid score
-                    all_scores.append(result["score"])
-            
-            self._percentile_cache[cache_key] = all_scores
+        Ranks against the fleet sketch installed for (period, as_of) when
+        there is one, otherwise against this engine's exact fleet index.
+        Drivers that are themselves in the distribution are excluded from
+        the denominator; their own score never counts as lower.
+        """
+        key = self._sketch_key(period, as_of)
+        with self._cache_lock:
+            sketch = self._fleet_sketches.get(key)
+            if sketch is not None:
+                self._fleet_sketches.move_to_end(key)
+        if sketch is not None:
+            lower_count, total = sketch.rank(scores), sketch.n
+        else:
+            index = self._get_fleet_index(period, as_of)
+            lower_count = np.searchsorted(index.sorted_scores, scores, side="left")
+            total = len(index)
         
-        comparison_scores = self._percentile_cache[cache_key]
+        others = total - in_distribution.astype(np.int64)
+        return np.where(
+            others > 0,
+            np.round(lower_count / np.maximum(others, 1) * 100),
+            50,  # Default to median if no comparison data
+        ).astype(np.int64)
+    
+    def get_score_sketch(self, period: str = "weekly", as_of=None, k: int = 200) -> KLLSketch:
+        """
+        Mergeable quantile sketch of this engine's valid scores
         
-        if not comparison_scores:
-            return 50  # Default to median if no comparison data
+        For sharded fleets: each shard exports its sketch (to_bytes), a
+        coordinator merges them with KLLSketch.merge_all, and every shard
+        installs the result with set_fleet_sketch.
+        """
+        sketch = KLLSketch(k)
+        sketch.update_many(self._get_fleet_index(period, as_of).sorted_scores.tolist())
+        return sketch
+    
+    def set_fleet_sketch(self, period: str, sketch: Optional[KLLSketch], as_of=None):
+        """
+        Rank percentiles against a fleet-wide sketch (None to go back to
+        this engine's own drivers)
         
-        # Count drivers with lower scores
-        lower_count = sum(1 for s in comparison_scores if s < score)
+        Without as_of the sketch serves current-time queries; with it, only
+        queries for that exact as-of second. Only the HISTORICAL_INDEX_LIMIT
+        most recently used as_of sketches are kept.
+        """
+        key = self._sketch_key(period, as_of)
+        with self._cache_lock:
+            if sketch is None:
+                self._fleet_sketches.pop(key, None)
+                return
+            self._fleet_sketches[key] = sketch
+            self._fleet_sketches.move_to_end(key)
+            historical = [k for k in self._fleet_sketches if isinstance(k, tuple)]
+            for stale in historical[:max(0, len(historical) - self.HISTORICAL_INDEX_LIMIT)]:
+                del self._fleet_sketches[stale]
+    
+    @staticmethod
+    def _sketch_key(period: str, as_of=None) -> Union[str, Tuple[str, int]]:
+        return period if as_of is None else (period, as_epoch_seconds(as_of))
+    
+    @staticmethod
+    def _fleet_index_from_table(table: np.ndarray, day: Optional[int] = None) -> FleetScoreIndex:
+        """Fleet index over the valid (> 0) scores of a whole-fleet score table"""
+        rated = table[table["score"] > 0]
+        return FleetScoreIndex(
+            np.sort(rated["score"].astype(np.int64)),
+            dict(zip(rated["driver_id"].tolist(), rated["score"].tolist())),
+            day,
+        )
+    
+    @staticmethod
+    def _today() -> int:
+        """Current epoch day"""
+        return as_epoch_seconds(None) // SECONDS_PER_DAY
+    
+    def _current_fleet_index(self, period: str) -> Optional[FleetScoreIndex]:
+        """The current-time index for period, if it was built today"""
+        index = self._fleet_index.get(period)
+        return index if index is not None and index.day == self._today() else None
+    
+    def _get_fleet_index(self, period: str, as_of=None) -> FleetScoreIndex:
+        """
+        Score distribution over every loaded driver for a period
         
-        # Calculate percentile
-        percentile = (lower_count / len(comparison_scores)) * 100
+        Built in one pass on first use and reused until sessions change
+        (see invalidate_fleet_index). Drivers without enough data, or with a
+        score of 0, are left out of the distribution. The current-time index
+        is also rebuilt once a day, as sessions age out of the analysis
+        window. Indexes for an explicit as_of are cached separately, keyed by
+        the as-of second, and only the HISTORICAL_INDEX_LIMIT most recently
+        used are kept.
+        """
+        if as_of is None:
+            index = self._current_fleet_index(period)
+            if index is None:
+                today = self._today()
+                index = self._fleet_index_from_table(self._score_table(list(self._session_cache), period), today)
+                self._fleet_index[period] = index
+            return index
         
-        return int(round(percentile))
+        key = (period, as_epoch_seconds(as_of))
+        with self._cache_lock:
+            index = self._historical_index.get(key)
+            if index is not None:
+                self._historical_index.move_to_end(key)
+                return index
+        # Built outside the lock; concurrent misses on one key may both build
+        index = self._fleet_index_from_table(self._score_table(list(self._session_cache), period, key[1]))
+        with self._cache_lock:
+            self._historical_index[key] = index
+            while len(self._historical_index) > self.HISTORICAL_INDEX_LIMIT:
+                self._historical_index.popitem(last=False)
+        return index
     
     def _generate_comparison_text(self, percentile: int) -> str:
         """
@@ -333,7 +1429,7 @@ class SteadinessEngine:
     # BREAKDOWN: COMPONENT CONSISTENCY ANALYSIS
     # =========================================================================
     
-    def get_consistency_breakdown(self, driver_id: str) -> Dict:
+    def get_consistency_breakdown(self, driver_id: str, as_of=None) -> Dict:
         """
         Analyze WHY a driver has their steadiness score
         
@@ -348,6 +1444,7 @@ class SteadinessEngine:
         
         Args:
             driver_id: Driver to analyze
+            as_of: Analyze the window ending at this time (default now)
             
         Returns:
             {
@@ -359,42 +1456,57 @@ class SteadinessEngine:
                 "details": {...}  # Raw metrics for transparency
             }
         """
-        if driver_id not in self._session_cache:
-            return self._empty_breakdown_response("No session data")
-        
-        sessions = self._session_cache[driver_id]
-        
-        # Filter recent sessions (90 days)
-        cutoff = datetime.now() - timedelta(days=90)
-        recent = [s for s in sessions if s.timestamp >= cutoff]
+        live = self._live.get(driver_id) if as_of is None else None
+        if live is not None:
+            # Incremental mode: every input below is a running statistic
+            with self._live_lock:
+                live.expire(self._analysis_window()[0])
+                session_count = len(live)
+                weekly_hours = live.hours_moments[Period.WEEKLY]
+                weeks_analyzed = weekly_hours.count
+                hours_cv, avg_weekly_hours = weekly_hours.cv, weekly_hours.mean
+                eph_cv, avg_eph = live.eph_moments.cv, live.eph_moments.mean
+                zone_counts = live.zone_counts.copy()
+        else:
+            sessions = self._driver_sessions(driver_id)
+            if sessions is None:
+                return self._empty_breakdown_response("No session data")
+            
+            # Filter recent sessions (90 days)
+            recent = sessions.window(*self._analysis_window(as_of))
+            session_count = len(recent)
+            
+            # Aggregate by week for hour analysis
+            _, _, weekly_hours, _ = aggregate_periods(recent.timestamps, recent.hours, recent.earnings, "weekly")
+            weeks_analyzed = len(weekly_hours)
+            hours_cv = self._calculate_cv(weekly_hours.tolist())
+            avg_weekly_hours = float(weekly_hours.mean()) if weeks_analyzed else 0.0
+            
+            eph_values = recent.earnings_per_hour()
+            eph_cv = self._calculate_cv(eph_values.tolist())
+            avg_eph = float(eph_values.mean()) if len(eph_values) else 0.0
+            zone_counts = np.bincount(recent.zone_ids)
         
-        if len(recent) < self.MIN_SESSIONS_FOR_ANALYSIS:
+        if session_count < self.MIN_SESSIONS_FOR_ANALYSIS:
             return self._empty_breakdown_response("Insufficient data")
         
-        # Aggregate by week for hour analysis
-        weekly = self._aggregate_by_period(recent, "weekly")
-        
-        if len(weekly) < 2:
+        if weeks_analyzed < 2:
             return self._empty_breakdown_response("Need at least 2 weeks")
         
         # 1. HOUR CONSISTENCY
         # Measures: How consistent are weekly hours worked?
-        weekly_hours = [w.hours for w in weekly]
-        hours_cv = self._calculate_cv(weekly_hours)
         hour_consistency = self._cv_to_steadiness_score(hours_cv)
         
         # 2. EARNINGS CONSISTENCY (PER HOUR)
         # Measures: How consistent is earnings rate across sessions?
-        eph_values = [s.earnings_per_hour for s in recent if s.hours_worked > 0]
-        eph_cv = self._calculate_cv(eph_values)
         earnings_consistency = self._cv_to_steadiness_score(eph_cv)
         
         # 3. ZONE CONSISTENCY
         # Measures: Do they stick to same zones or work everywhere?
-        zone_consistency, zone_entropy = self._calculate_zone_consistency(recent)
+        zone_consistency, zone_entropy = self._calculate_zone_consistency(zone_counts)
         
         # 4. OVERALL SCORE
-        overall_result = self.get_steadiness_score(driver_id, "weekly")
+        overall_result = self.get_steadiness_score(driver_id, "weekly", as_of)
         overall_score = overall_result["score"]
         
         # 5. GENERATE ACTIONABLE INSIGHTS
@@ -402,8 +1514,8 @@ class SteadinessEngine:
             hour_consistency, 
             earnings_consistency, 
             zone_consistency,
-            weekly_hours,
-            eph_values
+            avg_weekly_hours,
+            avg_eph
         )
         
         return {
@@ -416,10 +1528,11 @@ class SteadinessEngine:
                 "hours_cv": round(hours_cv, 1),
                 "eph_cv": round(eph_cv, 1),
                 "zone_entropy": round(zone_entropy, 2),
-                "avg_weekly_hours": round(statistics.mean(weekly_hours), 1),
-                "avg_eph": round(statistics.mean(eph_values), 2),
-                "unique_zones_worked": len(set(z for s in recent for z in s.zones)),
-                "weeks_analyzed": len(weekly)
+                "avg_weekly_hours": round(avg_weekly_hours, 1),
+                "avg_eph": round(avg_eph, 2),
+                "unique_zones_worked": int(np.count_nonzero(zone_counts)),
+                "top_zones": self._top_zone_shares(zone_counts),
+                "weeks_analyzed": weeks_analyzed
             }
         }
     
@@ -442,9 +1555,261 @@ class SteadinessEngine:
         std_dev = statistics.stdev(values)
         return (std_dev / mean_val) * 100
     
-    def _calculate_zone_consistency(self, sessions: List[DriverSession]) -> Tuple[int, float]:
+    def _calculate_zone_consistency(self, zone_counts: np.ndarray) -> Tuple[int, float]:
         """
         Calculate zone consistency using Shannon Entropy
         
         Logic:
-        - Driver works same 2 
\ No newline at end of file
+        - Driver works same 2-3 zones every week → low entropy → high consistency
+        - Driver spreads evenly across the whole city → high entropy → low consistency
+        
+        Entropy (bits) is measured over every zone visit and scaled against
+        zone_entropy_max_bits (an even spread over the city_zones city zones).
+        
+        Returns:
+            (zone_consistency 0-100, entropy in bits)
+        """
+        if zone_counts.sum() == 0:
+            return 0, 0.0
+        entropy = float(zone_entropy_bits(zone_counts))
+        return int(self._entropy_to_consistency(entropy)), entropy
+    
+    @property
+    def zone_entropy_max_bits(self) -> float:
+        """Entropy of an even spread over every city zone: log2(city_zones), at least 1 bit"""
+        return float(np.log2(max(self.city_zones, 2)))
+    
+    def _entropy_to_consistency(self, entropy):
+        """Scale entropy (scalar or array) to a 0-100 consistency score"""
+        max_bits = self.zone_entropy_max_bits
+        normalized = np.minimum(entropy, max_bits) / max_bits
+        return np.round(100 * (1 - normalized))
+    
+    def _top_zone_shares(self, zone_counts: np.ndarray, top: int = 3) -> List[Dict]:
+        """Most-visited zones with their share (%) of zone visits"""
+        total = zone_counts.sum()
+        if total == 0:
+            return []
+        codes = np.argsort(-zone_counts, kind="stable")[:top]
+        return [
+            {"zone": self.zones.names[code], "share": round(float(zone_counts[code] / total * 100), 1)}
+            for code in codes.tolist() if zone_counts[code] > 0
+        ]
+    
+    def get_zone_consistency_bulk(self, driver_ids: Optional[List[str]] = None,
+                                  as_of=None) -> np.recarray:
+        """
+        Zone consistency for many drivers from one 2-D bincount
+        
+        Zone codes of every driver's recent sessions are offset by
+        driver_index * n_zones and counted in a single np.bincount, giving a
+        (drivers, zones) histogram; entropy, unique zones and top-zone share
+        are then row-wise array operations.
+        
+        Returns:
+            Record array with driver_id, zone_consistency, zone_entropy,
+            unique_zones, top_zone (code, -1 if none) and top_zone_share (%)
+        """
+        driver_ids = list(self._session_cache) if driver_ids is None else list(driver_ids)
+        n, n_zones = len(driver_ids), max(len(self.zones), 1)
+        width = max((len(d) for d in driver_ids), default=1)
+        table = np.zeros(n, dtype=[
+            ("driver_id", f"U{width}"), ("zone_consistency", np.int16), ("zone_entropy", np.float64),
+            ("unique_zones", np.int16), ("top_zone", np.int32), ("top_zone_share", np.float64),
+        ])
+        table["driver_id"] = driver_ids
+        
+        start, end = self._analysis_window(as_of)
+        empty = SessionArrays.empty()
+        zone_codes = [(self._driver_sessions(d) or empty).window(start, end).zone_ids for d in driver_ids]
+        visits = np.fromiter((len(z) for z in zone_codes), dtype=np.int64, count=n)
+        owners = np.repeat(np.arange(n, dtype=np.int64), visits)
+        codes = np.concatenate(zone_codes) if n else np.empty(0, dtype=np.int64)
+        counts = np.bincount(owners * n_zones + codes, minlength=n * n_zones).reshape(n, n_zones)
+        
+        entropy = zone_entropy_bits(counts)
+        has_visits = visits > 0
+        table["zone_entropy"] = entropy
+        table["zone_consistency"] = np.where(has_visits, self._entropy_to_consistency(entropy), 0)
+        table["unique_zones"] = np.count_nonzero(counts, axis=1)
+        table["top_zone"] = np.where(has_visits, counts.argmax(axis=1), -1)
+        table["top_zone_share"] = np.divide(counts.max(axis=1, initial=0) * 100.0, visits,
+                                            out=np.zeros(n), where=has_visits)
+        return table.view(np.recarray)
+    
+    def _generate_breakdown_insights(self, hour_consistency: int,
+                                     earnings_consistency: int,
+                                     zone_consistency: int,
+                                     avg_hours: float,
+                                     avg_eph: float) -> List[str]:
+        """
+        Turn component scores into short, actionable insight strings
+        
+        Strong components are called out as strengths; the weakest component
+        gets a concrete suggestion.
+        """
+        insights = []
+        
+        if hour_consistency >= self.COMPONENT_STRONG:
+            insights.append(f"Your hours are consistent ({hour_consistency}%) - around {avg_hours:.0f} hrs each week")
+        if earnings_consistency >= self.COMPONENT_STRONG:
+            insights.append(f"Your hourly rate is steady at about ${avg_eph:.0f}/hr")
+        if zone_consistency >= self.COMPONENT_STRONG:
+            insights.append(f"You stick to familiar zones ({zone_consistency}%), which keeps earnings predictable")
+        
+        components = {
+            "hours": hour_consistency,
+            "earnings": earnings_consistency,
+            "zones": zone_consistency,
+        }
+        weakest = min(components, key=components.get)
+        if components[weakest] < self.COMPONENT_STRONG:
+            if weakest == "hours":
+                insights.append(f"Your weekly hours vary ({hour_consistency}%). Aim for a regular ~{avg_hours:.0f} hr schedule")
+            elif weakest == "earnings":
+                insights.append(f"Your $/hr swings a lot ({earnings_consistency}%). Focus on your best-paying time slots")
+            else:
+                insights.append(f"You work many different zones ({zone_consistency}%). Focus on your top 2-3 zones to improve predictability")
+        
+        return insights
+    
+    def _empty_breakdown_response(self, reason: str) -> Dict:
+        """Return empty breakdown response with error reason"""
+        return {
+            "hour_consistency": 0,
+            "earnings_consistency": 0,
+            "zone_consistency": 0,
+            "overall_score": 0,
+            "insights": [reason],
+            "details": {}
+        }
+    
+    # =========================================================================
+    # VOLATILITY TREND
+    # =========================================================================
+    
+    def get_volatility_trend(self, driver_id: str, weeks: int = 12,
+                             window_weeks: Optional[int] = None, as_of=None) -> Dict:
+        """
+        Rolling earnings volatility over recent weeks, with a trend label
+        
+        Each point is the CV of weekly earnings over the window ending that
+        week. Weeks without sessions count as $0 once the driver has started
+        driving; points whose window reaches back before the first session
+        have no volatility value.
+        
+        Algorithm:
+        1. Dense weekly earnings series (one bincount) ending with the last
+           complete week before as_of (a week in progress would read as a
+           sudden drop in earnings)
+        2. Rolling CV in one O(n) prefix-sum sweep (rolling_cv)
+        3. Least-squares slope of the rolling CV → total change over the span
+        4. Change beyond ±TREND_CHANGE_THRESHOLD → IMPROVING/DECLINING
+        
+        Args:
+            driver_id: Driver to analyze
+            weeks: Number of weekly points to return
+            window_weeks: Rolling window length (default ROLLING_WINDOW_WEEKS)
+            as_of: Last week is the latest one that ends at or before this
+                time (default now); sessions after that week are ignored
+            
+        Returns:
+            {
+                "trend": "improving",
+                "trend_text": "Your income is getting steadier...",
+                "weeks": 12,
+                "window_weeks": 4,
+                "current_volatility": 18.2,  # CV % of the latest window
+                "change": -7.5,  # Change in CV points across the span
+                "data_points": [
+                    {"week": "2025-W38", "week_start": "2025-09-15",
+                     "earnings": 812.5, "volatility": 21.4},
+                    ...
+                ]
+            }
+        """
+        window = window_weeks or self.ROLLING_WINDOW_WEEKS
+        sessions = self._driver_sessions(driver_id)
+        if sessions is None or len(sessions) == 0:
+            return self._empty_volatility_response(weeks, window, "No session data found")
+        
+        # Week keys are epoch days of Mondays; series covers `weeks` points plus window lead-in
+        end = as_epoch_seconds(as_of)
+        this_week = int(period_keys(np.array([end - 1]), "weekly")[0])
+        if (this_week + 7) * SECONDS_PER_DAY > end:
+            this_week -= 7  # still in progress
+        end = (this_week + 7) * SECONDS_PER_DAY
+        first_session_week = int(period_keys(sessions.timestamps[:1], "weekly")[0])
+        first_point = this_week - 7 * (weeks - 1)
+        series_start = max(first_point - 7 * (window - 1), first_session_week)
+        
+        in_range = sessions.window(series_start * SECONDS_PER_DAY, end)
+        week_index = (period_keys(in_range.timestamps, "weekly") - series_start) // 7
+        n_weeks = max(0, (this_week - series_start) // 7 + 1)
+        weekly_earnings = np.bincount(week_index, weights=in_range.earnings, minlength=n_weeks)
+        
+        volatility = rolling_cv(weekly_earnings, window)
+        # rolling value i covers weeks i..i+window-1 → aligned to week i+window-1
+        point_volatility = np.full(n_weeks, np.nan)
+        point_volatility[window - 1:] = volatility
+        
+        first_index = max(0, (first_point - series_start) // 7)
+        data_points = [
+            {
+                "week": period_label(series_start + 7 * i, "weekly"),
+                "week_start": period_start(series_start + 7 * i, "weekly").strftime("%Y-%m-%d"),
+                "earnings": round(float(weekly_earnings[i]), 2),
+                "volatility": None if np.isnan(point_volatility[i]) else round(float(point_volatility[i]), 1),
+            }
+            for i in range(first_index, n_weeks)
+        ]
+        
+        trend_cv = point_volatility[first_index:]
+        trend_cv = trend_cv[~np.isnan(trend_cv)]
+        if len(trend_cv) < 2:
+            response = self._empty_volatility_response(
+                weeks, window, f"Need at least {window + 1} weeks of history"
+            )
+            response["data_points"] = data_points
+            return response
+        
+        slope = np.polyfit(np.arange(len(trend_cv)), trend_cv, 1)[0]
+        change = float(slope * (len(trend_cv) - 1))
+        if change <= -self.TREND_CHANGE_THRESHOLD:
+            direction = TrendDirection.IMPROVING
+        elif change >= self.TREND_CHANGE_THRESHOLD:
+            direction = TrendDirection.DECLINING
+        else:
+            direction = TrendDirection.STABLE
+        
+        return {
+            "trend": direction.value,
+            "trend_text": self._generate_trend_text(direction, change),
+            "weeks": weeks,
+            "window_weeks": window,
+            "current_volatility": round(float(trend_cv[-1]), 1),
+            "change": round(change, 1),
+            "data_points": data_points,
+        }
+    
+    def _generate_trend_text(self, direction: TrendDirection, change: float) -> str:
+        """Human-readable summary of a volatility trend"""
+        if direction is TrendDirection.IMPROVING:
+            return f"Your income is getting steadier - volatility down {abs(change):.0f} points"
+        if direction is TrendDirection.DECLINING:
+            return f"Your income is getting less predictable - volatility up {abs(change):.0f} points"
+        if direction is TrendDirection.STABLE:
+            return "Your income volatility is holding steady"
+        return "Not enough history to show a trend yet"
+    
+    def _empty_volatility_response(self, weeks: int, window: int, reason: str) -> Dict:
+        """Return empty volatility trend response with error reason"""
+        return {
+            "trend": TrendDirection.INSUFFICIENT_DATA.value,
+            "trend_text": reason,
+            "weeks": weeks,
+            "window_weeks": window,
+            "current_volatility": 0,
+            "change": 0,
+            "data_points": []
+        }
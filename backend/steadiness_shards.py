@@ -0,0 +1,322 @@
+"""
+Multi-city, multi-process steadiness service.
+
+Drivers are partitioned by city, then by a stable hash of driver_id, across
+worker processes that each own one SteadinessEngine:
+
+    service = ShardedSteadinessService({"Sydney": 4, "Melbourne": 2})
+    service.load_bulk_sessions("Sydney", sessions_by_driver)
+    service.get_steadiness_score("D0001")            # routed to its shard
+    service.get_steadiness_scores_bulk(city="Sydney")  # scatter-gather
+    service.close()
+
+Percentiles compare a driver with their own city. Each city's cohort is the
+merge of its shards' KLL score sketches; the coordinator installs the
+merged sketch on the city's shards before any query that ranks drivers,
+so a shard's percentiles are city-wide rather than shard-local.
+"""
+
+import multiprocessing
+import threading
+import zlib
+from collections import OrderedDict
+from typing import Dict, List, Optional, Tuple
+
+import numpy as np
+
+from quantile_sketch import KLLSketch
+from steadiness_engine import SECONDS_PER_DAY, DriverSession, SteadinessEngine, as_epoch_seconds
+
+
+def _shard_main(conn, city: str, engine_kwargs: Dict):
+    """Worker loop: apply (method, args, kwargs) messages to one engine until None."""
+    engine = SteadinessEngine(city, **engine_kwargs)
+    while True:
+        message = conn.recv()
+        if message is None:
+            break
+        method, args, kwargs = message
+        try:
+            conn.send((True, getattr(engine, method)(*args, **kwargs)))
+        except Exception as exc:  # surfaced to the caller by the coordinator
+            conn.send((False, exc))
+    conn.close()
+
+
+class _Shard:
+    """Coordinator-side handle: a worker process and its pipe."""
+
+    def __init__(self, ctx, city: str, engine_kwargs: Dict):
+        self.city = city
+        self.conn, child_conn = ctx.Pipe()
+        self.process = ctx.Process(target=_shard_main, args=(child_conn, city, engine_kwargs), daemon=True)
+        self.process.start()
+        child_conn.close()
+        self.lock = threading.Lock()
+
+    def send(self, method: str, *args, **kwargs):
+        self.conn.send((method, args, kwargs))
+
+    def receive(self):
+        ok, result = self.conn.recv()
+        if not ok:
+            raise result
+        return result
+
+
+class ShardedSteadinessService:
+    """SteadinessEngine API over city/hash-partitioned worker processes."""
+
+    # Cohorts kept for explicit as_of values; no larger than the engine's own
+    # limit, so shards never drop a sketch the coordinator still relies on
+    COHORT_LIMIT = SteadinessEngine.HISTORICAL_INDEX_LIMIT
+
+    def __init__(self, shards_per_city: Dict[str, int], engine_kwargs: Optional[Dict] = None,
+                 mp_context=None):
+        if any(count < 1 for count in shards_per_city.values()):
+            raise ValueError("Every city needs at least one shard")
+        ctx = mp_context or multiprocessing.get_context()
+        self.shards: Dict[str, List[_Shard]] = {
+            city: [_Shard(ctx, city, engine_kwargs or {}) for _ in range(count)]
+            for city, count in shards_per_city.items()
+        }
+        self._driver_city: Dict[str, str] = {}
+        # (city, period, as_of second or None) -> (merged score sketch, epoch day built)
+        self._cohorts: "OrderedDict[Tuple[str, str, Optional[int]], Tuple[KLLSketch, int]]" = OrderedDict()
+        self._lock = threading.Lock()
+        # Answers for drivers no shard owns, without a round trip
+        self._no_data = SteadinessEngine(zones_csv=None, **(engine_kwargs or {}))
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, *exc):
+        self.close()
+
+    def close(self):
+        for shard in self._all_shards():
+            try:
+                shard.conn.send(None)
+            except (BrokenPipeError, OSError):
+                pass
+        for shard in self._all_shards():
+            shard.process.join(timeout=5)
+
+    # -------------------------------------------------------------------------
+    # Routing
+    # -------------------------------------------------------------------------
+
+    def _all_shards(self) -> List[_Shard]:
+        return [shard for shards in self.shards.values() for shard in shards]
+
+    def shard_index(self, city: str, driver_id: str) -> int:
+        """Stable (process-independent) shard number of a driver within its city."""
+        return zlib.crc32(driver_id.encode("utf-8")) % len(self.shards[city])
+
+    def city_of(self, driver_id: str) -> Optional[str]:
+        return self._driver_city.get(driver_id)
+
+    def _owner(self, driver_id: str) -> Optional[_Shard]:
+        city = self._driver_city.get(driver_id)
+        if city is None:
+            return None
+        return self.shards[city][self.shard_index(city, driver_id)]
+
+    def _call(self, shard: _Shard, method: str, *args, **kwargs):
+        with shard.lock:
+            shard.send(method, *args, **kwargs)
+            return shard.receive()
+
+    def _scatter(self, calls: List[Tuple[_Shard, str, tuple, dict]]) -> List:
+        """Send every call before reading any reply, so shards work in parallel."""
+        shards = sorted({id(c[0]): c[0] for c in calls}.values(), key=id)
+        for shard in shards:
+            shard.lock.acquire()
+        try:
+            for shard, method, args, kwargs in calls:
+                shard.send(method, *args, **kwargs)
+            replies, error = [], None
+            for shard, *_ in calls:
+                try:
+                    replies.append(shard.receive())
+                except Exception as exc:
+                    replies.append(None)
+                    error = error or exc
+            if error is not None:
+                raise error
+            return replies
+        finally:
+            for shard in shards:
+                shard.lock.release()
+
+    # -------------------------------------------------------------------------
+    # Loading
+    # -------------------------------------------------------------------------
+
+    def load_bulk_sessions(self, city: str, sessions_by_driver: Dict):
+        """
+        Register drivers under a city and load their sessions on the owning shards
+
+        Values may be DriverSession lists or SessionArrays whose zone codes come
+        from data/zones.csv (the code table every shard shares).
+        """
+        parts: List[Dict] = [{} for _ in self.shards[city]]
+        for driver_id, sessions in sessions_by_driver.items():
+            previous = self._driver_city.get(driver_id)
+            if previous is not None and previous != city:
+                raise ValueError(f"{driver_id} is already registered under {previous}")
+            parts[self.shard_index(city, driver_id)][driver_id] = sessions
+        with self._lock:
+            self._driver_city.update(dict.fromkeys(sessions_by_driver, city))
+            self._invalidate(city)
+        self._scatter([
+            (shard, "load_bulk_sessions", (part,), {})
+            for shard, part in zip(self.shards[city], parts) if part
+        ])
+
+    def append_session(self, driver_id: str, session: DriverSession, city: Optional[str] = None):
+        """Stream one session to the owning shard (city required for new drivers)."""
+        city = city or self._driver_city.get(driver_id)
+        if city is None:
+            raise KeyError(f"Unknown driver {driver_id}; pass city for a new driver")
+        with self._lock:
+            self._driver_city.setdefault(driver_id, city)
+            self._invalidate(city)
+        self._call(self.shards[city][self.shard_index(city, driver_id)], "append_session", driver_id, session)
+
+    def _invalidate(self, city: str):
+        for key in [k for k in self._cohorts if k[0] == city]:
+            del self._cohorts[key]
+
+    # -------------------------------------------------------------------------
+    # City cohorts
+    # -------------------------------------------------------------------------
+
+    def get_city_cohort(self, city: str, period: str = "weekly", as_of=None) -> KLLSketch:
+        """
+        Score sketch for every driver in a city (merged from its shards)
+
+        Built on first use per (city, period, as_of) and pushed to the city's
+        shards; reloading or appending sessions in the city invalidates it,
+        and the current-time cohort is rebuilt once a day. Only the
+        COHORT_LIMIT most recently used as_of cohorts are kept; an evicted
+        one is also removed from its shards.
+        """
+        key = (city, period, None if as_of is None else as_epoch_seconds(as_of))
+        today = as_epoch_seconds(None) // SECONDS_PER_DAY
+        with self._lock:
+            entry = self._cohorts.get(key)
+            if entry is not None and (key[2] is not None or entry[1] == today):
+                self._cohorts.move_to_end(key)
+                return entry[0]
+
+        shards = self.shards[city]
+        sketches = self._scatter([(shard, "get_score_sketch", (period, key[2]), {}) for shard in shards])
+        cohort = KLLSketch.merge_all(sketches)
+        self._scatter([(shard, "set_fleet_sketch", (period, cohort, key[2]), {}) for shard in shards])
+        with self._lock:
+            self._cohorts[key] = (cohort, today)
+            historical = [k for k in self._cohorts if k[2] is not None]
+            evicted = historical[:max(0, len(historical) - self.COHORT_LIMIT)]
+            for stale in evicted:
+                del self._cohorts[stale]
+        for stale_city, stale_period, stale_as_of in evicted:
+            self._scatter([(shard, "set_fleet_sketch", (stale_period, None, stale_as_of), {})
+                           for shard in self.shards[stale_city]])
+        return cohort
+
+    def get_city_cohort_stats(self, city: str, period: str = "weekly", as_of=None) -> Dict:
+        """Size and score quartiles of a city's cohort."""
+        cohort = self.get_city_cohort(city, period, as_of)
+        if len(cohort) == 0:
+            return {"city": city, "period": period, "drivers_scored": 0}
+        return {
+            "city": city,
+            "period": period,
+            "drivers_scored": len(cohort),
+            "p25": cohort.quantile(0.25),
+            "median": cohort.quantile(0.5),
+            "p75": cohort.quantile(0.75),
+        }
+
+    # -------------------------------------------------------------------------
+    # Per-driver calls (routed)
+    # -------------------------------------------------------------------------
+
+    def get_steadiness_score(self, driver_id: str, period: str = "weekly", as_of=None) -> Dict:
+        shard = self._owner(driver_id)
+        if shard is None:
+            return self._unknown_driver("get_steadiness_score", driver_id, period, as_of=as_of)
+        self.get_city_cohort(shard.city, period, as_of)
+        return self._call(shard, "get_steadiness_score", driver_id, period, as_of)
+
+    def get_consistency_breakdown(self, driver_id: str, as_of=None) -> Dict:
+        shard = self._owner(driver_id)
+        if shard is None:
+            return self._unknown_driver("get_consistency_breakdown", driver_id, as_of=as_of)
+        self.get_city_cohort(shard.city, "weekly", as_of)
+        return self._call(shard, "get_consistency_breakdown", driver_id, as_of)
+
+    def get_volatility_trend(self, driver_id: str, weeks: int = 12,
+                             window_weeks: Optional[int] = None, as_of=None) -> Dict:
+        shard = self._owner(driver_id)
+        if shard is None:
+            return self._unknown_driver("get_volatility_trend", driver_id, weeks, window_weeks, as_of=as_of)
+        return self._call(shard, "get_volatility_trend", driver_id, weeks, window_weeks, as_of)
+
+    def _unknown_driver(self, method: str, driver_id: str, *args, **kwargs) -> Dict:
+        """The engine's empty "no session data" response, answered locally."""
+        return getattr(self._no_data, method)(driver_id, *args, **kwargs)
+
+    # -------------------------------------------------------------------------
+    # Fleet queries (scatter-gather)
+    # -------------------------------------------------------------------------
+
+    def get_steadiness_scores_bulk(self, driver_ids: Optional[List[str]] = None,
+                                   period: str = "weekly", as_of=None,
+                                   city: Optional[str] = None) -> np.recarray:
+        """
+        Bulk scores across shards, percentiles ranked within each driver's city
+
+        Args:
+            driver_ids: Drivers to score (default: every driver, or every
+                driver in `city`); unknown ids are dropped
+            period, as_of: As for SteadinessEngine.get_steadiness_scores_bulk
+            city: Restrict to one city
+
+        Returns:
+            Record array with a city field plus the engine's score fields,
+            grouped by shard
+        """
+        if driver_ids is None:
+            driver_ids = [d for d, c in self._driver_city.items() if city is None or c == city]
+        by_shard: Dict[int, Tuple[_Shard, List[str]]] = {}
+        for driver_id in driver_ids:
+            shard = self._owner(driver_id)
+            if shard is None or (city is not None and shard.city != city):
+                continue
+            by_shard.setdefault(id(shard), (shard, []))[1].append(driver_id)
+
+        for shard_city in {shard.city for shard, _ in by_shard.values()}:
+            self.get_city_cohort(shard_city, period, as_of)
+        calls = [(shard, "get_steadiness_scores_bulk", (ids, period, as_of), {})
+                 for shard, ids in by_shard.values()]
+        tables = self._scatter(calls) if calls else []
+        return self._concat_tables([shard.city for shard, *_ in calls], tables)
+
+    @staticmethod
+    def _concat_tables(cities: List[str], tables: List[np.ndarray]) -> np.recarray:
+        """Stack shard tables under one dtype (widest driver_id/city strings)."""
+        id_width = max([t.dtype["driver_id"].itemsize // 4 for t in tables] + [1])
+        city_width = max([len(c) for c in cities] + [1])
+        base = tables[0].dtype.descr[1:] if tables else []
+        fields = [("city", f"U{city_width}"), ("driver_id", f"U{id_width}")] + base
+        out = np.zeros(sum(len(t) for t in tables), dtype=fields)
+        row = 0
+        for city, table in zip(cities, tables):
+            chunk = out[row:row + len(table)]
+            chunk["city"] = city
+            for name in table.dtype.names:
+                chunk[name] = table[name]
+            row += len(table)
+        return out.view(np.recarray)
@@ -0,0 +1,68 @@
+import os
+
+import pandas as pd
+
+from data_store import DataStore
+
+BACKEND_DIR = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+
+
+def _write_driver(tmp_path):
+    data_dir, features_dir = tmp_path / "data", tmp_path / "features"
+    data_dir.mkdir()
+    features_dir.mkdir()
+    trips = pd.read_csv(os.path.join(BACKEND_DIR, "data", "driver_D0001_trips.csv"), nrows=2)
+    trips["pickup_timestamp"] = ["2025-09-15T07:10:00", "2025-09-15T08:05:00"]
+    trips["dropoff_timestamp"] = ["2025-09-15T07:40:00", "2025-09-15T08:30:00"]
+    trips["is_canceled"] = 0
+    trips.to_csv(data_dir / "driver_D0001_trips.csv", index=False)
+    pd.DataFrame({
+        "driver_id": ["D0001", "D0001"], "date": ["2025-09-15", "2025-09-15"], "hour": [7, 8],
+        "day_of_week": [0, 0], "is_weekend": [0, 0], "total_trips": [1, 1],
+        "total_canceled_trips": [0, 0], "total_minutes_worked": [30, 25],
+        "total_earnings": [20.5, 15.0], "average_surge": [1.0, 1.0], "any_rain": [0, 0],
+        "weather": ["clear", "clear"], "is_event": [0, 0], "competition_index": [0.4, 0.4],
+    }).to_csv(features_dir / "D0001_hourly.csv", index=False)
+    return data_dir, features_dir
+
+
+def test_hourly_csv_fallback_without_feature_store(tmp_path):
+    data_dir, features_dir = _write_driver(tmp_path)
+    store = DataStore(data_dir=str(data_dir), feature_store_dir=str(tmp_path / "store"),
+                      features_dir=str(features_dir))
+
+    profile = store.get_driver_profile("D0001")
+
+    assert profile["total_trips"] == 2
+    assert profile["total_hours"] == round(55 / 60, 1)
+    assert store.get_driver_profile("D9999") is None
+
+
+def test_snapshot_restored_until_a_source_file_changes(tmp_path, monkeypatch):
+    data_dir, features_dir = _write_driver(tmp_path)
+    builds = []
+    build_engine = DataStore._build_engine
+
+    def counting_build(self):
+        builds.append(self)
+        return build_engine(self)
+    monkeypatch.setattr(DataStore, "_build_engine", counting_build)
+
+    def start():
+        return DataStore(data_dir=str(data_dir), feature_store_dir=str(tmp_path / "store"),
+                         features_dir=str(features_dir),
+                         snapshot_path=str(tmp_path / "steadiness.snap")).preload()
+
+    built = start()
+    restored = start()
+    assert len(builds) == 1
+    assert restored.steadiness().driver_ids() == ["D0001"]
+    assert restored.as_of == built.as_of
+    assert restored.get_steadiness_score("D0001") == built.get_steadiness_score("D0001")
+
+    trip_file = data_dir / "driver_D0001_trips.csv"
+    os.utime(trip_file, ns=(trip_file.stat().st_atime_ns, trip_file.stat().st_mtime_ns + 10**9))
+    start()
+    assert len(builds) == 2
+    start()
+    assert len(builds) == 2
@@ -0,0 +1,24 @@
+import pandas as pd
+
+from metrics_cube import build_cube
+
+
+def _features():
+    return pd.DataFrame({
+        "driver_id": ["D0001", "D0001", "D0002"],
+        "date": ["2025-09-15", "2025-09-16", "2025-09-16"],
+        "hour": [7, 8, 9],
+        "total_trips": [4, 2, 3],
+        "total_canceled_trips": [0, 1, 0],
+        "total_minutes_worked": [84, 37, 50],
+        "total_earnings": [54.48, 26.84, 40.0],
+    })
+
+
+def test_values_with_empty_days_and_hours(tmp_path):
+    cube = build_cube(_features(), str(tmp_path / "cube.npy"),
+                      metrics=["total_trips", "total_earnings"])
+
+    assert cube.values("D0001", "total_trips", days=[]).shape == (0, 24)
+    assert cube.values("D0001", "total_trips", hours=[]).shape == (2, 0)
+    assert cube.values("D0001", "total_trips", days=["2025-09-16"], hours=[8]).tolist() == [[2.0]]
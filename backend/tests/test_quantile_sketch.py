@@ -0,0 +1,38 @@
+import numpy as np
+import pytest
+
+from quantile_sketch import KLLSketch
+
+
+def _stream(n, seed):
+    return np.random.default_rng(seed).normal(60, 15, size=n)
+
+
+def test_bytes_round_trip():
+    sketch = KLLSketch(k=64, seed=3)
+    sketch.update_many(_stream(5000, 1))
+
+    restored = KLLSketch.from_bytes(sketch.to_bytes())
+
+    assert (restored.k, restored.n, restored.seed) == (sketch.k, sketch.n, sketch.seed)
+    assert restored.levels == sketch.levels
+    assert restored.quantile(0.5) == sketch.quantile(0.5)
+    with pytest.raises(ValueError):
+        KLLSketch.from_bytes(b"XXXX" + sketch.to_bytes()[4:])
+
+
+def test_merged_shards_rank_within_error_bound():
+    shards = [_stream(20000, seed) for seed in range(4)]
+    sketches = []
+    for seed, values in enumerate(shards):
+        sketch = KLLSketch(k=200, seed=seed)
+        sketch.update_many(values)
+        sketches.append(KLLSketch.from_bytes(sketch.to_bytes()))
+
+    merged = KLLSketch.merge_all(sketches)
+    everything = np.sort(np.concatenate(shards))
+
+    assert merged.n == len(everything)
+    probes = np.quantile(everything, np.linspace(0.01, 0.99, 25))
+    exact = np.searchsorted(everything, probes, side="left")
+    assert np.max(np.abs(merged.rank(probes) - exact)) / len(everything) < 0.02
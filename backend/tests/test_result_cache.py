@@ -0,0 +1,56 @@
+from result_cache import DataVersions, ResultCache
+
+
+class _Clock:
+    def __init__(self):
+        self.now = 0.0
+
+    def __call__(self):
+        return self.now
+
+
+def _counting(calls):
+    def score(driver_id, period="weekly"):
+        calls.append((driver_id, period))
+        return {"driver_id": driver_id, "period": period, "points": list(range(50))}
+    return score
+
+
+def test_hits_until_the_driver_version_changes():
+    calls, versions = [], DataVersions()
+    cache = ResultCache(version_source=versions)
+    score = _counting(calls)
+
+    first = cache.call(score, "D0001")
+    assert cache.call(score, "D0001") is first
+    cache.call(score, "D0001", "monthly")
+    versions.bump("D0001")
+    cache.call(score, "D0001")
+
+    assert calls == [("D0001", "weekly"), ("D0001", "monthly"), ("D0001", "weekly")]
+    assert (cache.hits, cache.misses) == (1, 3)
+
+
+def test_lru_eviction_under_byte_budget_and_ttl():
+    calls, clock = [], _Clock()
+    score = _counting(calls)
+    probe = ResultCache()
+    probe.call(score, "D0000")
+    entry_bytes = probe.current_bytes
+    cache = ResultCache(max_bytes=3 * entry_bytes, ttl=60, clock=clock)
+
+    for driver_id in ("D0001", "D0002", "D0003"):
+        cache.call(score, driver_id)
+    cache.call(score, "D0001")  # now most recently used
+    cache.call(score, "D0004")  # evicts D0002
+    assert len(cache) == 3 and cache.current_bytes <= cache.max_bytes
+    assert cache.evictions == 1
+
+    calls.clear()
+    cache.call(score, "D0001")
+    cache.call(score, "D0002")
+    assert calls == [("D0002", "weekly")]
+
+    clock.now = 61
+    cache.call(score, "D0004")
+    assert cache.expirations == 1 and calls[-1] == ("D0004", "weekly")
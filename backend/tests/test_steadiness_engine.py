@@ -0,0 +1,237 @@
+import statistics
+from datetime import datetime, timedelta
+
+import numpy as np
+import pytest
+
+import steadiness_engine
+from steadiness_engine import (
+    SECONDS_PER_DAY, DriverSession, SessionArrays, SteadinessEngine, TrendDirection, ZoneInterner,
+    as_epoch_seconds, rolling_cv, snapshot_header,
+)
+
+
+def _steady_sessions(driver_id, last_day, days):
+    """One identical session per day, ending on last_day"""
+    return [
+        DriverSession(driver_id, last_day - timedelta(days=d) + timedelta(hours=8), 6.0, 180.0, ["CBD"])
+        for d in range(days)
+    ]
+
+
+def test_volatility_trend_ignores_week_in_progress():
+    # 2025-10-27 is a Monday; the driver has not driven yet this week
+    sunday = datetime(2025, 10, 26)
+    engine = SteadinessEngine()
+    engine.load_driver_sessions("D0001", _steady_sessions("D0001", sunday, 70))
+
+    trend = engine.get_volatility_trend("D0001", weeks=6, as_of=datetime(2025, 10, 27, 1))
+
+    assert trend["trend"] != TrendDirection.DECLINING.value
+    assert trend["data_points"][-1]["week_start"] == "2025-10-20"
+    assert trend["data_points"][-1]["earnings"] == 7 * 180.0
+    assert trend["current_volatility"] == 0.0
+
+
+def test_zone_consistency_scale_ignores_other_drivers_zones():
+    engine = SteadinessEngine()
+    last_day = datetime(2025, 10, 26)
+    sessions = _steady_sessions("A", last_day, 40)
+    for i, session in enumerate(sessions):
+        session.zones = ["CBD", "EAST", "WEST"][:i % 3 + 1]
+    engine.load_driver_sessions("A", sessions)
+    as_of = datetime(2025, 10, 27)
+    before = engine.get_consistency_breakdown("A", as_of)["zone_consistency"]
+
+    engine.load_driver_sessions("B", [
+        DriverSession("B", last_day - timedelta(days=d, hours=-8), 6.0, 180.0, [f"NEW{d}"])
+        for d in range(39)
+    ])
+
+    assert engine.get_consistency_breakdown("A", as_of)["zone_consistency"] == before
+
+
+def _varied_sessions(driver_id, last_day, days):
+    """Daily sessions with earnings and hours that vary week to week"""
+    return [
+        DriverSession(driver_id, last_day - timedelta(days=d) + timedelta(hours=8),
+                      4.0 + d % 5, 120.0 + 15 * (d % 7) + d, ["CBD", "EAST", "WEST"][:1 + d % 3])
+        for d in reversed(range(days))
+    ]
+
+
+def test_incremental_matches_batch_after_appends():
+    now = datetime.now().replace(hour=0, minute=0, second=0, microsecond=0)
+    history = _varied_sessions("D0001", now - timedelta(days=10), 120)
+    recent = _varied_sessions("D0001", now - timedelta(days=1), 9)
+    batch, live = SteadinessEngine(), SteadinessEngine(incremental=True)
+    batch.load_driver_sessions("D0001", history + recent)
+    live.load_driver_sessions("D0001", history)
+    for session in recent:
+        live.append_session("D0001", session)
+
+    for period in ("daily", "weekly", "monthly"):
+        expected = batch.get_steadiness_score("D0001", period)
+        actual = live.get_steadiness_score("D0001", period)
+        assert actual["score"] == expected["score"]
+        assert actual["cv"] == pytest.approx(expected["cv"], abs=0.1)
+    assert live.get_consistency_breakdown("D0001") == batch.get_consistency_breakdown("D0001")
+
+
+def test_rejected_append_is_not_recorded():
+    now = datetime.now().replace(hour=0, minute=0, second=0, microsecond=0)
+    engine = SteadinessEngine(incremental=True)
+    engine.load_driver_sessions("D0001", _varied_sessions("D0001", now - timedelta(days=1), 30))
+    before = engine.get_consistency_breakdown("D0001")
+    history_before = engine.get_consistency_breakdown("D0001", as_of=now)  # read from session history
+
+    with pytest.raises(ValueError):
+        engine.append_session("D0001", DriverSession("D0001", now - timedelta(days=5), 9.0, 900.0, ["NB"]))
+
+    assert engine.get_consistency_breakdown("D0001") == before
+    assert engine.get_consistency_breakdown("D0001", as_of=now) == history_before
+
+
+def _freeze_now(monkeypatch, now):
+    class FrozenDatetime(datetime):
+        @classmethod
+        def now(cls, tz=None):
+            return now
+    monkeypatch.setattr(steadiness_engine, "datetime", FrozenDatetime)
+
+
+def test_current_fleet_index_drops_sessions_that_left_the_window(monkeypatch, tmp_path):
+    start = datetime(2025, 6, 2)
+    engine = SteadinessEngine()
+    engine.load_driver_sessions("A", _steady_sessions("A", start + timedelta(days=100), 180))
+    engine.load_driver_sessions("B", _varied_sessions("B", start - timedelta(days=1), 60))
+
+    _freeze_now(monkeypatch, start)
+    assert engine.get_steadiness_score("A")["percentile"] == 0  # ranked below B
+    engine.save_snapshot(str(tmp_path / "engine.snap"))
+    restored = SteadinessEngine.from_snapshot(str(tmp_path / "engine.snap"))
+
+    _freeze_now(monkeypatch, start + timedelta(days=100))  # B's sessions have aged out
+    assert engine.get_steadiness_score("A")["percentile"] == 50
+    assert restored.get_steadiness_score("A")["percentile"] == 50
+
+
+def _fleet(last_day, drivers=12):
+    """Drivers with differing history lengths and end dates; the last has too little data"""
+    fleet = {
+        f"D{i:04d}": _varied_sessions(f"D{i:04d}", last_day - timedelta(days=i % 4), 40 + 5 * i)
+        for i in range(drivers - 1)
+    }
+    fleet[f"D{drivers - 1:04d}"] = _steady_sessions(f"D{drivers - 1:04d}", last_day, 2)
+    return fleet
+
+
+def test_bulk_scores_match_per_driver_scores():
+    as_of = datetime(2025, 10, 27)
+    engine = SteadinessEngine()
+    engine.load_bulk_sessions(_fleet(as_of - timedelta(days=1)))
+
+    table = engine.get_steadiness_scores_bulk(period="weekly", as_of=as_of)
+
+    assert table.driver_id.tolist() == engine.driver_ids()
+    for row in table:
+        single = engine.get_steadiness_score(row.driver_id, "weekly", as_of)
+        assert row.score == single["score"]
+        assert row.percentile == single["percentile"]
+        assert row.sample_size == single["sample_size"]
+        if single["sample_size"]:
+            assert row.cv == pytest.approx(single["cv"], abs=0.05)
+            assert row.min_earnings == pytest.approx(single["earnings_range"]["min"], abs=0.005)
+            assert row.max_earnings == pytest.approx(single["earnings_range"]["max"], abs=0.005)
+    assert table.score[-1] == 0 and table.sample_size[-1] == 0
+
+
+def test_rolling_cv_matches_direct_computation():
+    rng = np.random.default_rng(7)
+    series = rng.uniform(200, 1500, size=(3, 40))
+    for window in (2, 4, 13, 40):
+        expected = [
+            [statistics.stdev(row[i:i + window]) / statistics.mean(row[i:i + window]) * 100
+             for i in range(len(row) - window + 1)]
+            for row in series
+        ]
+        np.testing.assert_allclose(rolling_cv(series, window), expected, rtol=1e-9)
+    assert rolling_cv(series[0], 41).shape == (0,)
+
+
+def _weekly_sessions(driver_id, first_monday, weekly_earnings):
+    return [
+        DriverSession(driver_id, first_monday + timedelta(weeks=w, hours=9), 30.0, earnings, ["CBD"])
+        for w, earnings in enumerate(weekly_earnings)
+    ]
+
+
+def test_volatility_trend_direction():
+    monday = datetime(2025, 6, 2)
+    erratic, steady = [300.0, 1100.0] * 6, [700.0] * 12
+    as_of = monday + timedelta(weeks=24)
+    engine = SteadinessEngine()
+    engine.load_driver_sessions("settling", _weekly_sessions("settling", monday, erratic + steady))
+    engine.load_driver_sessions("slipping", _weekly_sessions("slipping", monday, steady + erratic))
+
+    settling = engine.get_volatility_trend("settling", weeks=16, as_of=as_of)
+    slipping = engine.get_volatility_trend("slipping", weeks=16, as_of=as_of)
+
+    assert settling["trend"] == TrendDirection.IMPROVING.value
+    assert settling["current_volatility"] == 0.0
+    assert slipping["trend"] == TrendDirection.DECLINING.value
+    assert [p["earnings"] for p in slipping["data_points"]] == steady[-4:] + erratic
+
+
+def test_session_window_is_a_half_open_view():
+    day = datetime(2025, 9, 1)
+    sessions = SessionArrays.from_sessions(_steady_sessions("D0001", day, 10), ZoneInterner())
+    start = int(as_epoch_seconds(day - timedelta(days=5)) + 8 * 3600)  # exactly a session start
+
+    recent = sessions.window(start, start + 3 * SECONDS_PER_DAY)
+
+    assert recent.timestamps.tolist() == [start + d * SECONDS_PER_DAY for d in range(3)]
+    assert np.shares_memory(recent.timestamps, sessions.timestamps)
+    assert np.shares_memory(recent.earnings, sessions.earnings)
+    assert len(sessions.window(end=start)) == 4 and len(sessions.window(start)) == 6
+
+
+def test_explicit_as_of_is_deterministic_and_index_cache_bounded():
+    last_day = datetime(2025, 10, 26)
+    engine = SteadinessEngine()
+    engine.load_bulk_sessions(_fleet(last_day))
+    fresh = SteadinessEngine()
+    fresh.load_bulk_sessions(_fleet(last_day))
+    days = [last_day - timedelta(days=d) for d in range(SteadinessEngine.HISTORICAL_INDEX_LIMIT + 4)]
+
+    first = [engine.get_steadiness_score("D0003", "weekly", day) for day in days]
+    again = [engine.get_steadiness_score("D0003", "weekly", day) for day in reversed(days)][::-1]
+
+    assert first == again == [fresh.get_steadiness_score("D0003", "weekly", day) for day in days]
+    assert len(engine._historical_index) == SteadinessEngine.HISTORICAL_INDEX_LIMIT
+
+
+def test_snapshot_round_trip(tmp_path):
+    last_day = datetime.now().replace(hour=0, minute=0, second=0, microsecond=0) - timedelta(days=1)
+    engine = SteadinessEngine()
+    engine.load_bulk_sessions(_fleet(last_day))
+    engine.append_session("D0002", DriverSession("D0002", last_day + timedelta(hours=20), 3.0, 95.0, ["NB"]))
+    engine.get_steadiness_scores_bulk(period="weekly")  # builds the current-time fleet index
+    path = str(tmp_path / "engine.snap")
+    engine.save_snapshot(path, sources={"trips": [1, 2]})
+
+    restored = SteadinessEngine.from_snapshot(path)
+
+    assert snapshot_header(path)["sources"] == {"trips": [1, 2]}
+    assert restored.driver_ids() == engine.driver_ids()
+    assert restored._fleet_index["weekly"].scores == engine._fleet_index["weekly"].scores
+    assert not restored._driver_sessions("D0002").timestamps.flags.writeable  # mapped, not copied
+    for driver_id in engine.driver_ids():
+        assert restored.get_steadiness_score(driver_id) == engine.get_steadiness_score(driver_id)
+        assert restored.get_consistency_breakdown(driver_id) == engine.get_consistency_breakdown(driver_id)
+        assert restored.get_volatility_trend(driver_id) == engine.get_volatility_trend(driver_id)
+
+    with open(path, "r+b") as f:
+        f.write(b"NOTASNAP")
+    with pytest.raises(ValueError):
+        SteadinessEngine.from_snapshot(path)
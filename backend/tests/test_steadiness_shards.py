@@ -0,0 +1,69 @@
+from datetime import datetime, timedelta
+
+import pytest
+
+from steadiness_engine import DriverSession, SteadinessEngine
+from steadiness_shards import ShardedSteadinessService
+
+
+def _city_sessions(prefix, last_day, drivers):
+    """Drivers whose daily earnings vary at different rates"""
+    return {
+        f"{prefix}{i:03d}": [
+            DriverSession(f"{prefix}{i:03d}", last_day - timedelta(days=d, hours=-9), 4.0 + d % 5,
+                          150.0 + (10 + i) * (d % 7) + d, ["CBD", "EAST"][:1 + (d + i) % 2])
+            for d in reversed(range(50 + 3 * i))
+        ]
+        for i in range(drivers)
+    }
+
+
+@pytest.fixture(scope="module")
+def fleets():
+    last_day = datetime(2025, 10, 26)
+    cities = {"Sydney": _city_sessions("S", last_day, 14), "Melbourne": _city_sessions("M", last_day, 9)}
+    engines = {}
+    for city, sessions in cities.items():
+        engines[city] = SteadinessEngine(city)
+        engines[city].load_bulk_sessions(sessions)
+    with ShardedSteadinessService({"Sydney": 3, "Melbourne": 2}) as service:
+        for city, sessions in cities.items():
+            service.load_bulk_sessions(city, sessions)
+        yield cities, engines, service
+
+
+def test_routed_calls_match_a_single_city_engine(fleets):
+    cities, engines, service = fleets
+    as_of = datetime(2025, 10, 27)
+    for city, sessions in cities.items():
+        for driver_id in sessions:
+            assert service.get_steadiness_score(driver_id, as_of=as_of) == \
+                engines[city].get_steadiness_score(driver_id, as_of=as_of)
+            assert service.get_consistency_breakdown(driver_id, as_of=as_of) == \
+                engines[city].get_consistency_breakdown(driver_id, as_of=as_of)
+    assert service.get_steadiness_score("NOBODY") == SteadinessEngine().get_steadiness_score("NOBODY")
+
+
+def test_bulk_scores_rank_within_each_city(fleets):
+    cities, engines, service = fleets
+    as_of = datetime(2025, 10, 27)
+    table = service.get_steadiness_scores_bulk(as_of=as_of)
+
+    assert sorted(table.driver_id.tolist()) == sorted(d for sessions in cities.values() for d in sessions)
+    for city, engine in engines.items():
+        expected = engine.get_steadiness_scores_bulk(as_of=as_of)
+        rows = {r.driver_id: r for r in table if r.city == city}
+        for row in expected:
+            assert (rows[row.driver_id].score, rows[row.driver_id].percentile) == (row.score, row.percentile)
+
+
+def test_cohorts_stay_bounded_and_correct_after_eviction(fleets):
+    cities, engines, service = fleets
+    days = [datetime(2025, 10, 27) - timedelta(days=d) for d in range(service.COHORT_LIMIT + 3)]
+    for day in days + days[:2]:
+        assert service.get_steadiness_score("S004", as_of=day) == \
+            engines["Sydney"].get_steadiness_score("S004", as_of=day)
+
+    assert len([key for key in service._cohorts if key[2] is not None]) == service.COHORT_LIMIT
+    stats = service.get_city_cohort_stats("Melbourne", as_of=days[0])
+    assert stats["drivers_scored"] == len(cities["Melbourne"])
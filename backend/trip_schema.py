@@ -0,0 +1,148 @@
+"""
+Compact, explicitly typed in-memory schema for trip-level data.
+
+Default pandas loading of driver_*_trips.csv keeps trip_id UUIDs and zone names
+as strings and every money column as float64. The compact schema stores:
+
+- trip_id as 16-byte fixed-size binary
+- driver_id and zone columns as categoricals
+- 0/1 flags as int8
+- coordinates, distance and surge as float32
+- money as int32 cents (column names keep their dollar names)
+
+Usage:
+  python3 trip_schema.py data/driver_D0001_trips.csv
+"""
+
+import sys
+from typing import Dict
+
+import numpy as np
+import pandas as pd
+import pyarrow as pa
+
+TIMESTAMP_COLUMNS = ["pickup_timestamp", "dropoff_timestamp"]
+
+CATEGORY_COLUMNS = [
+    "driver_id", "pickup_zone", "pickup_zone_name", "dropoff_zone", "dropoff_zone_name",
+]
+
+FLAG_COLUMNS = ["is_canceled", "is_weekend", "is_rain", "is_event", "surge_applied"]
+
+FLOAT32_COLUMNS = [
+    "pickup_lat", "pickup_lng", "dropoff_lat", "dropoff_lng",
+    "distance_km", "surge_multiplier",
+]
+
+MONEY_COLUMNS = [
+    "fare_base", "fare_time", "fare_distance", "fare_total",
+    "tip_amount", "cancel_fee", "service_fee", "driver_earnings",
+]
+
+# Dtypes read_csv can apply directly; money and trip_id are converted after parsing
+CSV_DTYPES: Dict[str, str] = {
+    **{c: "category" for c in CATEGORY_COLUMNS},
+    **{c: "int8" for c in FLAG_COLUMNS},
+    **{c: "float32" for c in FLOAT32_COLUMNS},
+    "duration_min": "int16",
+}
+
+TRIP_ID_TYPE = pa.binary(16)
+
+# ASCII hex digit -> nibble value
+_HEX_VALUES = np.zeros(256, dtype=np.uint8)
+_HEX_VALUES[np.frombuffer(b"0123456789", dtype=np.uint8)] = np.arange(10)
+_HEX_VALUES[np.frombuffer(b"abcdef", dtype=np.uint8)] = np.arange(10, 16)
+_HEX_VALUES[np.frombuffer(b"ABCDEF", dtype=np.uint8)] = np.arange(10, 16)
+
+
+def uuids_to_binary(trip_ids: pd.Series) -> pd.Series:
+    """Pack canonical UUID strings into a 16-byte fixed-size binary column."""
+    digits = trip_ids.astype(str).str.replace("-", "", regex=False)
+    ascii_hex = np.frombuffer("".join(digits).encode("ascii"), dtype=np.uint8)
+    nibbles = _HEX_VALUES[ascii_hex].reshape(-1, 32)
+    raw = (nibbles[:, 0::2] << 4) | nibbles[:, 1::2]
+    array = pa.FixedSizeBinaryArray.from_buffers(
+        TRIP_ID_TYPE, len(trip_ids), [None, pa.py_buffer(raw.tobytes())]
+    )
+    return pd.Series(array, index=trip_ids.index, dtype=pd.ArrowDtype(TRIP_ID_TYPE), name=trip_ids.name)
+
+
+def binary_to_uuids(trip_ids: pd.Series) -> pd.Series:
+    """Inverse of uuids_to_binary."""
+    hexes = trip_ids.map(lambda b: b.hex(), na_action="ignore")
+    return hexes.str[:8] + "-" + hexes.str[8:12] + "-" + hexes.str[12:16] + "-" + hexes.str[16:20] + "-" + hexes.str[20:]
+
+
+def dollars_to_cents(values: pd.Series) -> np.ndarray:
+    """Round dollar amounts to int32 cents."""
+    return np.round(values.to_numpy(dtype=np.float64) * 100).astype(np.int32)
+
+
+def cents_to_dollars(values: pd.Series) -> pd.Series:
+    """Int cents back to float dollars."""
+    return values / 100.0
+
+
+def compact_trips(trips: pd.DataFrame) -> pd.DataFrame:
+    """Convert a default-typed trip frame to the compact schema."""
+    trips = trips.copy()
+    for col, dtype in CSV_DTYPES.items():
+        if col in trips:
+            trips[col] = trips[col].astype(dtype)
+    for col in MONEY_COLUMNS:
+        if col in trips:
+            trips[col] = dollars_to_cents(trips[col])
+    for col in TIMESTAMP_COLUMNS:
+        if col in trips:
+            trips[col] = pd.to_datetime(trips[col])
+    if "date" in trips:
+        trips["date"] = pd.to_datetime(trips["date"])
+    if "trip_id" in trips:
+        trips["trip_id"] = uuids_to_binary(trips["trip_id"])
+    return trips
+
+
+def read_trips(path: str) -> pd.DataFrame:
+    """Load a trip CSV directly into the compact schema."""
+    trips = pd.read_csv(
+        path,
+        dtype={**CSV_DTYPES, **{c: "float64" for c in MONEY_COLUMNS}},
+        parse_dates=TIMESTAMP_COLUMNS + ["date"],
+    )
+    for col in MONEY_COLUMNS:
+        trips[col] = dollars_to_cents(trips[col])
+    trips["trip_id"] = uuids_to_binary(trips["trip_id"])
+    return trips
+
+
+def memory_report(path: str) -> pd.DataFrame:
+    """Per-column bytes for default pandas loading vs the compact schema."""
+    default = pd.read_csv(path, parse_dates=TIMESTAMP_COLUMNS)
+    compact = read_trips(path)
+    report = pd.DataFrame({
+        "default_bytes": default.memory_usage(deep=True, index=False),
+        "compact_bytes": compact.memory_usage(deep=True, index=False),
+    })
+    report["default_dtype"] = default.dtypes.astype(str)
+    report["compact_dtype"] = compact.dtypes.astype(str)
+    report.loc["TOTAL", ["default_bytes", "compact_bytes"]] = report[["default_bytes", "compact_bytes"]].sum()
+    report.attrs["rows"] = len(default)
+    return report
+
+
+def main():
+    if len(sys.argv) != 2:
+        raise SystemExit("Usage: python3 trip_schema.py <trips.csv>")
+    report = memory_report(sys.argv[1])
+    rows = max(1, report.attrs["rows"])
+    print(report.to_string())
+    default_total = report.loc["TOTAL", "default_bytes"]
+    compact_total = report.loc["TOTAL", "compact_bytes"]
+    print(f"\nTrips: {report.attrs['rows']:,}")
+    print(f"Bytes/trip: default {default_total / rows:,.1f} → compact {compact_total / rows:,.1f} "
+          f"({default_total / compact_total:.1f}x smaller)")
+
+
+if __name__ == "__main__":
+    main()